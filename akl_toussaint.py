@@ -0,0 +1,80 @@
+import numpy as np
+import time
+from monotone_chain import as_points, cross, monotone_chain
+from predicates import coordinate_span
+
+# Indices of the extreme points along the axis directions (and, for the octagon, the
+# diagonals), in counter-clockwise order starting from the bottom-most point.
+def extreme_points(points, octagon=True):
+    xs = points[:, 0]
+    ys = points[:, 1]
+    if not octagon:
+        return np.array([np.argmin(ys), np.argmax(xs), np.argmax(ys), np.argmin(xs)])
+    diff = xs - ys
+    total = xs + ys
+    return np.array([np.argmin(ys), np.argmax(diff), np.argmax(xs), np.argmax(total),
+                     np.argmax(ys), np.argmin(diff), np.argmin(xs), np.argmin(total)])
+
+# Akl-Toussaint interior elimination. Every point strictly inside the polygon spanned
+# by the 4 (or 8) directional extremes cannot be a hull vertex. Returns a boolean mask
+# of the points that survive and the number of points that were removed.
+def akl_toussaint(points, octagon=True):
+    points = as_points(points)
+    keep = np.ones(len(points), dtype=bool)
+    if len(points) < 3:
+        return keep, 0
+
+    # Extremes can coincide (a point can be extreme in several directions); repeated
+    # corners would give zero-length edges that no point is strictly inside of.
+    corners = points[extreme_points(points, octagon)]
+    if corners.dtype == np.float32:
+        corners = corners.astype(np.float64)
+    repeated = np.all(corners == np.roll(corners, 1, axis=0), axis=1)
+    corners = corners[~repeated]
+    if len(corners) < 3:
+        return keep, 0
+
+    xs = points[:, 0]
+    ys = points[:, 1]
+    span = coordinate_span(xs, ys)
+    inside = np.ones(len(points), dtype=bool)
+    for (ax, ay), (bx, by) in zip(corners, np.roll(corners, -1, axis=0)):
+        inside &= cross(ax, ay, bx, by, xs, ys, span) > 0
+    keep = ~inside
+    return keep, int(np.count_nonzero(inside))
+
+# Puts the prefilter in front of any hull algorithm. The returned function hulls only
+# the surviving points and returns the algorithm's result together with the number of
+# points the prefilter removed. `adapt` converts the surviving (m, 2) array into the
+# input convention the algorithm expects (for example a sorted list of lists).
+def prefiltered(algorithm, adapt=None, octagon=True):
+    def run(points):
+        points = np.asarray(points)
+        keep, removed = akl_toussaint(points, octagon)
+        survivors = points[keep]
+        if adapt is not None:
+            survivors = adapt(survivors)
+        return algorithm(survivors), removed
+    return run
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    from merge_hull_trial import divide
+
+    points = generate_points('gaussian', 1000000)
+
+    start_time = time.perf_counter()
+    (indices, hull), removed = prefiltered(monotone_chain)(points)
+    end_time = time.perf_counter()
+    print(hull)
+    print(f"Prefilter removed {removed} of {len(points)} points, "
+          f"monotone chain took {end_time - start_time} seconds in total")
+
+    merge_hull = prefiltered(divide, adapt=lambda survivors: sorted(survivors.tolist()))
+    hull, removed = merge_hull(points)
+    print(f"Merge hull ran on {len(points) - removed} points and found {len(hull)} vertices")
@@ -0,0 +1,117 @@
+import numpy as np
+import time
+from monotone_chain import as_points, monotone_chain
+from convex_hull import HullResult
+
+# For k evenly spaced directions u_j = (cos 2*pi*j/k, sin 2*pi*j/k), the index of a
+# point with the largest projection onto u_j, and that projection (the support value
+# h_j). The points are read once, in chunks: each chunk is projected onto the first
+# k/2 directions with one (k/2, 2) x (2, c) matrix product, and argmax / argmin over
+# the product give the extremes for u_j and for the opposite direction -u_j. The
+# product is laid out direction by direction because reducing along the contiguous
+# axis is several times faster than reducing across rows. Integer points are projected
+# in float64; only the choice among nearly tied extremes can be affected by that.
+def directional_extremes(points, k, chunk_size=16384):
+    half = k // 2
+    angles = np.pi * np.arange(half) / half
+    dtype = points.dtype if points.dtype.kind == 'f' else np.float64
+    directions = np.array([np.cos(angles), np.sin(angles)], dtype=dtype).T
+    rows = np.arange(half)
+    high = np.full(half, -np.inf)
+    low = np.full(half, np.inf)
+    high_index = np.zeros(half, dtype=np.intp)
+    low_index = np.zeros(half, dtype=np.intp)
+    for start in range(0, len(points), chunk_size):
+        projections = directions @ points[start:start + chunk_size].T.astype(dtype, copy=False)
+        top = projections.argmax(axis=1)
+        bottom = projections.argmin(axis=1)
+        top_values = projections[rows, top]
+        bottom_values = projections[rows, bottom]
+        better = top_values > high
+        high[better] = top_values[better]
+        high_index[better] = top[better] + start
+        better = bottom_values < low
+        low[better] = bottom_values[better]
+        low_index[better] = bottom[better] + start
+    return np.concatenate((high_index, low_index)), np.concatenate((high, -low))
+
+# Approximate hull from k directional extremes: the exact hull of the (at most k)
+# points that are extreme in one of k evenly spaced directions, found in a single
+# pass over the data (see directional_extremes). The result lies inside the exact
+# hull (as returned by graham_scan_trial.graham_scan or any other engine), and the
+# Hausdorff distance between the two is at most
+#
+#     (D / 2) * tan(pi / k)
+#
+# where D is the diameter of the points: every point outside the approximate hull
+# lies in a triangle over an edge between the extremes of two neighbouring
+# directions, bounded by the two support lines, whose apex angle is pi - 2*pi/k and
+# whose height is largest when it is isosceles. The true D is not known, but the
+# widest of the k directions is at least D * cos(pi / k), which gives the reported
+# `error_bound`. `a_posteriori_bound` is usually much tighter: the largest distance
+# from the apex of one of those triangles, computed from the actual support lines, to
+# its base. Returns a HullResult with both bounds in its stats.
+def approximate_hull(points, k=64, chunk_size=16384):
+    points = as_points(points)
+    k = max(4, k + k % 2)
+    if len(points) == 0:
+        return HullResult(points[:0], np.empty(0, dtype=np.intp), 'approximate', {'k': k})
+    extremes, support = directional_extremes(points, k, chunk_size)
+
+    candidates = np.unique(extremes)
+    kept, vertices = monotone_chain(points[candidates])
+    indices = candidates[kept]
+
+    widths = support[:k // 2] + support[k // 2:]
+    diameter = widths.max() / np.cos(np.pi / k)
+    stats = {
+        'k': k,
+        'error_bound': float(diameter / 2 * np.tan(np.pi / k)),
+        'a_posteriori_bound': _a_posteriori_bound(points, extremes, support, k),
+    }
+    return HullResult(vertices, indices, 'approximate', stats)
+
+# Largest distance from the apex of the triangle between neighbouring directions j and
+# j + 1 (the intersection of their support lines) to the segment joining their
+# extremes.
+def _a_posteriori_bound(points, extremes, support, k):
+    angles = 2 * np.pi * np.arange(k) / k
+    # directional_extremes lists u_0..u_{k/2-1} and then their opposites, which is
+    # already the order of increasing angle.
+    ux, uy = np.cos(angles), np.sin(angles)
+    a = points[extremes].astype(np.float64)
+    b = np.roll(a, -1, axis=0)
+    vx, vy = np.roll(ux, -1), np.roll(uy, -1)
+    h0, h1 = support, np.roll(support, -1)
+    determinant = ux * vy - uy * vx
+    apex_x = (h0 * vy - h1 * uy) / determinant
+    apex_y = (ux * h1 - vx * h0) / determinant
+
+    ex, ey = b[:, 0] - a[:, 0], b[:, 1] - a[:, 1]
+    length = ex * ex + ey * ey
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.clip(((apex_x - a[:, 0]) * ex + (apex_y - a[:, 1]) * ey) / length, 0, 1)
+    t = np.where(length > 0, t, 0)
+    distance = np.hypot(apex_x - a[:, 0] - t * ex, apex_y - a[:, 1] - t * ey)
+    return float(np.where(length > 0, distance, 0).max())
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('gaussian', 10000000)
+
+    for k in (16, 64, 256):
+        start_time = time.perf_counter()
+        result = approximate_hull(points, k)
+        end_time = time.perf_counter()
+        print(f"k={k}: {len(result)} vertices, error bound {result.stats['error_bound']}, "
+              f"a posteriori {result.stats['a_posteriori_bound']}, {end_time - start_time} seconds")
+
+    start_time = time.perf_counter()
+    monotone_chain(points)
+    end_time = time.perf_counter()
+    print(f"Exact hull took {end_time - start_time} seconds for {len(points)} points")
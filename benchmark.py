@@ -0,0 +1,143 @@
+import numpy as np
+import argparse
+import csv
+import json
+import time
+import tracemalloc
+from convex_hull import ALGORITHMS, convex_hull
+
+SIZES = [10 ** k for k in range(2, 8)]
+DISTRIBUTIONS = ['uniform', 'gaussian', 'circle']
+
+# Distributions that put every point on the hull, the worst case for the
+# output-sensitive algorithms.
+WORST_CASES = {'circle'}
+
+# Largest n each algorithm is run at. The pure Python scripts would take minutes (or
+# run out of recursion) beyond these; the rest go all the way up.
+SIZE_LIMITS = {
+    'graham_trial': 10 ** 6,
+    'merge_hull': 10 ** 5,
+    'quickhull': 10 ** 5,
+}
+
+# Same for the worst-case distributions, where Jarvis march is quadratic and the
+# divide-and-conquer engines lose their pruning.
+WORST_CASE_LIMITS = {
+    'jarvis': 10 ** 3,
+    'quickhull': 10 ** 4,
+    'quickhull_iterative': 10 ** 6,
+    'kirkpatrick_seidel': 10 ** 6,
+}
+
+COLUMNS = ['method', 'distribution', 'n', 'h', 'repeats', 'best', 'median', 'mean', 'peak_bytes']
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+    elif distribution == 'circle':
+        angles = np.random.uniform(0, 2 * np.pi, n)
+        return np.column_stack((10 * np.cos(angles), 10 * np.sin(angles)))
+
+def size_limit(method, distribution):
+    limit = SIZE_LIMITS.get(method, SIZES[-1])
+    if distribution in WORST_CASES:
+        limit = min(limit, WORST_CASE_LIMITS.get(method, limit))
+    return limit
+
+# Times one algorithm on one point set. The timings are `repeats` separate
+# perf_counter samples; the peak memory comes from one more run under tracemalloc,
+# kept apart so the tracing overhead does not leak into the timings. NumPy reports
+# its buffers to tracemalloc, so array allocations are included, but memory used by
+# worker processes (method="parallel") is not.
+def run_case(method, points, repeats):
+    samples = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = convex_hull(points, method)
+        samples.append(time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    try:
+        convex_hull(points, method)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'method': method,
+        'n': len(points),
+        'h': len(result),
+        'repeats': repeats,
+        'best': min(samples),
+        'median': float(np.median(samples)),
+        'mean': float(np.mean(samples)),
+        'peak_bytes': peak_bytes,
+    }
+
+# Runs every method on every distribution and size, skipping the combinations above
+# the method's size limit. All methods see the same points for a given distribution
+# and size. Returns one row per combination, as a dict keyed by COLUMNS.
+def run_benchmark(methods=None, distributions=None, sizes=None, repeats=5, seed=0, progress=None):
+    methods = list(ALGORITHMS) if methods is None else methods
+    distributions = DISTRIBUTIONS if distributions is None else distributions
+    sizes = SIZES if sizes is None else sizes
+    rows = []
+    for distribution in distributions:
+        for n in sizes:
+            np.random.seed(seed)
+            points = generate_points(distribution, n)
+            for method in methods:
+                if n > size_limit(method, distribution):
+                    continue
+                row = run_case(method, points, repeats)
+                row['distribution'] = distribution
+                rows.append(row)
+                if progress is not None:
+                    progress(row)
+    return rows
+
+def write_json(rows, path):
+    with open(path, 'w') as f:
+        json.dump([{column: row[column] for column in COLUMNS} for row in rows], f, indent=2)
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+def format_row(row):
+    return (f"{row['method']:<20} {row['distribution']:<10} {row['n']:>10} {row['h']:>8} "
+            f"{row['best'] * 1000:>12.3f} {row['median'] * 1000:>12.3f} {row['peak_bytes'] / 2 ** 20:>10.1f}")
+
+# Plain text table of the results, grouped by distribution and size with the fastest
+# method first, so the engine to deploy for a workload is the first line of its group.
+def summary_table(rows):
+    header = (f"{'method':<20} {'dist':<10} {'n':>10} {'h':>8} "
+              f"{'best ms':>12} {'median ms':>12} {'peak MiB':>10}")
+    lines = [header, '-' * len(header)]
+    order = {distribution: i for i, distribution in enumerate(dict.fromkeys(row['distribution'] for row in rows))}
+    for row in sorted(rows, key=lambda row: (order[row['distribution']], row['n'], row['median'])):
+        lines.append(format_row(row))
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the convex hull algorithms.')
+    parser.add_argument('--methods', nargs='+', choices=sorted(ALGORITHMS))
+    parser.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS)
+    parser.add_argument('--sizes', nargs='+', type=lambda s: int(float(s)))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', default='benchmark.json')
+    parser.add_argument('--csv', default='benchmark.csv')
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.methods, args.distributions, args.sizes, args.repeats, args.seed,
+                         progress=lambda row: print(format_row(row), flush=True))
+    write_json(rows, args.json)
+    write_csv(rows, args.csv)
+    print()
+    print(summary_table(rows))
@@ -0,0 +1,172 @@
+import numpy as np
+import time
+import hull_stats
+from monotone_chain import as_points, cross, monotone_chain
+from grouped_hull import grouped_hull
+from predicates import kernel_coordinates
+
+# Hulls consecutive groups of m points, all in one grouped_hull call. The hulls are
+# packed into a (groups, width) array of point indices, each row padded by repeating
+# its first vertex, together with the number of vertices in each row.
+def mini_hulls(points, m):
+    _, offsets, indices = grouped_hull(points, np.arange(len(points)) // m)
+    sizes = np.diff(offsets)
+    packed = np.repeat(indices[offsets[:-1], None], sizes.max(), axis=1)
+    rows = np.repeat(np.arange(len(sizes)), sizes)
+    packed[rows, np.arange(len(indices)) - offsets[rows]] = indices
+    return packed, sizes
+
+# Elementwise choice between candidates a and b seen from p: True where b should be
+# preferred, i.e. b lies clockwise of p->a, or on it and farther away. `span` bounds
+# every coordinate difference of the input and selects the static filter of the
+# orientation tests, here and in the functions below.
+def prefer_second(px, py, ax, ay, bx, by, span):
+    turn = cross(px, py, ax, ay, bx, by, span)
+    farther = (bx - px) ** 2 + (by - py) ** 2 > (ax - px) ** 2 + (ay - py) ** 2
+    return (turn < 0) | ((turn == 0) & farther)
+
+# Binary-searched tangent from p to every mini-hull at once: for each row, the position
+# of the vertex q such that the whole mini-hull lies left of (or on) the ray p->q, the
+# farthest one if several qualify. Seen from p, the angle along a counter-clockwise
+# hull falls to that vertex and rises after it, and comparing against vertex 0 tells
+# which side of the minimum a probe is on. A vertex equal to p is treated as having
+# the largest angle, so the mini-hull p came from needs no special case.
+def tangents(hx, hy, sizes, px, py, span):
+    rows = np.arange(len(sizes))
+
+    def vertex(i):
+        i = i % sizes
+        return hx[rows, i], hy[rows, i]
+
+    def is_p(x, y):
+        return (x == px) & (y == py)
+
+    def rising(i):
+        ax, ay = vertex(i)
+        bx, by = vertex(i + 1)
+        return np.where(is_p(bx, by), True,
+                        np.where(is_p(ax, ay), False, cross(px, py, ax, ay, bx, by, span) > 0))
+
+    x0, y0 = vertex(np.zeros(len(sizes), dtype=np.intp))
+    first_is_p = is_p(x0, y0)
+
+    def before_first(i):
+        x, y = vertex(i)
+        return np.where(is_p(x, y), False,
+                        np.where(first_is_p, True, cross(px, py, x0, y0, x, y, span) < 0))
+
+    def after_first(i):
+        x, y = vertex(i)
+        return np.where(is_p(x, y), True,
+                        np.where(first_is_p, False, cross(px, py, x0, y0, x, y, span) > 0))
+
+    # If the angle rises out of vertex 0, the minimum is the first rising vertex with
+    # a smaller angle than vertex 0; otherwise it is the first vertex that either
+    # rises or has already climbed back above vertex 0. No such vertex means vertex 0.
+    rises_at_first = rising(np.zeros(len(sizes), dtype=np.intp))
+    lo = np.ones(len(sizes), dtype=np.intp)
+    hi = sizes.copy()
+    while np.any(lo < hi):
+        active = lo < hi
+        mid = (lo + hi) // 2
+        found = np.where(rises_at_first, rising(mid) & before_first(mid),
+                         rising(mid) | after_first(mid))
+        hi = np.where(active & found, mid, hi)
+        lo = np.where(active & ~found, mid + 1, lo)
+
+    # A two-vertex mini-hull collinear with p has no rising vertex to stop at, so the
+    # search settles on the nearer end; moving on to the next vertex fixes that.
+    best = lo % sizes
+    x, y = vertex(best)
+    nx, ny = vertex(best + 1)
+    move = prefer_second(px, py, x, y, nx, ny, span) & ~is_p(nx, ny) & ~is_p(x, y)
+    return np.where(move, (best + 1) % sizes, best)
+
+# Position of the candidate that every other candidate lies left of (or on) when seen
+# from p, preferring the farthest one among collinear candidates. Candidates equal to
+# p are ignored. Evaluated as a knockout tournament so each round is one vector step.
+def most_clockwise(px, py, cx, cy, span):
+    contenders = np.flatnonzero((cx != px) | (cy != py))
+    while len(contenders) > 1:
+        odd = contenders[-1:] if len(contenders) % 2 else contenders[:0]
+        a = contenders[0:len(contenders) - 1:2]
+        b = contenders[1::2]
+        second = prefer_second(px, py, cx[a], cy[a], cx[b], cy[b], span)
+        contenders = np.concatenate((np.where(second, b, a), odd))
+    return contenders[0]
+
+# Jarvis wrap over the mini-hulls, one tangent query per mini-hull and step. Gives up
+# (returns None) once the hull has more than `limit` vertices.
+def wrap(xs, ys, packed, sizes, start, limit, span):
+    hx = xs[packed]
+    hy = ys[packed]
+    rows = np.arange(len(sizes))
+    hull = [start]
+    px, py = xs[start], ys[start]
+    stats = hull_stats.active
+    for _ in range(limit):
+        if stats is not None:
+            stats.add('wrap_steps')
+        positions = tangents(hx, hy, sizes, px, py, span)
+        winner = most_clockwise(px, py, hx[rows, positions], hy[rows, positions], span)
+        following = packed[winner, positions[winner]]
+        px, py = xs[following], ys[following]
+        if px == xs[start] and py == ys[start]:
+            return np.array(hull, dtype=np.intp)
+        hull.append(following)
+    return None
+
+# Chan's output-sensitive O(n log h) hull. Guesses m for the hull size, hulls groups of
+# m points with the monotone chain and wraps them with Jarvis march using binary-search
+# tangents; if the wrap does not close within m steps the guess is squared. Once m^2
+# reaches n, log m is already within a factor of two of log n and one monotone chain
+# pass is cheaper than wrapping a few huge mini-hulls one vertex at a time, so with
+# the default m inputs of up to 65536 points go straight to the monotone chain.
+# Returns the hull indices and coordinates in the same order as monotone_chain.
+def chan(points, m=256):
+    points = as_points(points)
+    n = len(points)
+    xs, ys, span = kernel_coordinates(points[:, 0], points[:, 1])
+
+    # The wrap starts at the lexicographically smallest point, which is a hull vertex.
+    leftmost = np.flatnonzero(xs == xs.min()) if n else None
+    while True:
+        # With a single distinct point (span 0) there is nothing to wrap around.
+        if m * m >= n or span == 0:
+            return monotone_chain(points)
+        start = leftmost[np.argmin(ys[leftmost])]
+        if hull_stats.active is not None:
+            hull_stats.active.add('hull_size_guesses')
+        packed, sizes = mini_hulls(points, m)
+        hull = wrap(xs, ys, packed, sizes, start, m, span)
+        if hull is not None:
+            return hull, points[hull]
+        m = min(m * m, n)
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('gaussian', 1000000)
+
+    start_time = time.perf_counter()
+    indices, hull = chan(points)
+    end_time = time.perf_counter()
+    print(hull)
+
+    print(f"Chan's algorithm took {end_time - start_time} seconds for {len(points)} points")
+
+    # With a small m the wrap over grouped mini-hulls runs even for small inputs;
+    # check it against the monotone chain on general and degenerate points.
+    t = np.random.uniform(0, 1, 20000)
+    nearly_collinear = np.column_stack((0.5 + t * 11.5, 0.5 + t * 11.5))
+    nearly_collinear[:, 1] += np.random.randint(-2, 3, len(t)) * np.spacing(nearly_collinear[:, 1])
+    for name, sample in (('gaussian', generate_points('gaussian', 20000)),
+                         ('grid', np.random.randint(0, 50, (20000, 2))),
+                         ('nearly collinear', nearly_collinear)):
+        for m in (4, 8, 32):
+            same = np.array_equal(chan(sample, m=m)[1], monotone_chain(sample)[1])
+            print(f"m={m} on {name} points: {'matches' if same else 'DIFFERS FROM'} monotone_chain")
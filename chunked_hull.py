@@ -0,0 +1,76 @@
+import numpy as np
+import os
+import tempfile
+import time
+from convex_hull import HullResult, convex_hull
+
+# Opens a point file without reading it: .npy files through np.load with mmap_mode,
+# anything else as raw binary (x, y) pairs of the given dtype through np.memmap.
+# Returns an (n, 2) memory-mapped array.
+def open_points(path, dtype=np.float64):
+    if str(path).endswith('.npy'):
+        points = np.load(path, mmap_mode='r')
+    else:
+        points = np.memmap(path, dtype=dtype, mode='r')
+    return points.reshape(-1, 2)
+
+# Out-of-core hull of a point file (or any (n, 2) array-like that supports slicing,
+# such as a memmap). The points are read in chunks of `chunk_size` points and each
+# chunk is hulled together with the hull vertices carried over from the chunks before
+# it, with convex_hull and the given method, so at most chunk_size + h points are in
+# memory at once whatever the file size. Returns a HullResult whose indices are
+# positions in the whole input (None if the method does not report indices); its
+# stats hold the number of chunks, the bytes read and the throughput.
+def chunked_hull(source, chunk_size=1 << 20, method='auto', dtype=np.float64):
+    points = open_points(source, dtype) if isinstance(source, (str, os.PathLike)) else source
+    n = len(points)
+    vertices = np.empty((0, 2), dtype=points.dtype)
+    indices = np.empty(0, dtype=np.intp)
+    chunks = 0
+    used = method
+
+    start_time = time.perf_counter()
+    for start in range(0, n, chunk_size):
+        chunk = np.asarray(points[start:start + chunk_size])
+        result = convex_hull(np.concatenate((vertices, chunk)), method)
+        if indices is not None and result.indices is not None:
+            positions = np.concatenate((indices, np.arange(start, start + len(chunk))))
+            indices = positions[result.indices]
+        else:
+            indices = None
+        vertices = result.vertices
+        used = result.method
+        chunks += 1
+    seconds = time.perf_counter() - start_time
+
+    nbytes = n * 2 * points.dtype.itemsize
+    stats = {
+        'chunks': chunks,
+        'bytes': nbytes,
+        'seconds': seconds,
+        'bytes_per_second': nbytes / seconds if seconds > 0 else float('inf'),
+    }
+    return HullResult(vertices, indices, used, stats)
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    # Writes 20M uniform points (320 MB) to a temporary .npy file, ten million at a
+    # time, and hulls it back chunk by chunk.
+    n = 20000000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'points.npy')
+        target = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(n, 2))
+        for start in range(0, n, 10000000):
+            target[start:start + 10000000] = generate_points('uniform', 10000000)
+        target.flush()
+        del target
+
+        result = chunked_hull(path)
+        print(result.vertices)
+        print(f"{result.stats['bytes'] / 1e9} GB in {result.stats['chunks']} chunks took "
+              f"{result.stats['seconds']} seconds ({result.stats['bytes_per_second'] / 1e6} MB/s)")
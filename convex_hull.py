@@ -0,0 +1,172 @@
+import numpy as np
+import time
+from monotone_chain import as_points, monotone_chain
+from akl_toussaint import akl_toussaint
+from chan import chan
+from iterative_quickhull import quickhull_iterative
+from kirkpatrick_seidel import kirkpatrick_seidel
+
+# Result of convex_hull(). The vertices are an (h, 2) array in counter-clockwise order
+# starting from the lexicographically smallest point, without collinear boundary
+# points, whichever algorithm produced them. The indices point into the input and
+# are None for the algorithms that only report coordinates. `stats` carries extra
+# information about the run, such as the size estimate used by method="auto".
+class HullResult:
+    __slots__ = ('vertices', 'indices', 'method', 'stats')
+
+    def __init__(self, vertices, indices, method, stats=None):
+        self.vertices = vertices
+        self.indices = indices
+        self.method = method
+        self.stats = {} if stats is None else stats
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __repr__(self):
+        return f"HullResult(method={self.method!r}, vertices={len(self.vertices)})"
+
+# The algorithms that import matplotlib are only loaded when they are asked for.
+# Each adapter takes an (n, 2) array with at least three points and returns
+# (indices or None, vertices) in whatever order it likes.
+def _graham(points):
+    from graham_scan import convexHull
+    hull = convexHull(points, len(points))
+    if hull is None:
+        return None, points[monotone_chain(points)[0]]
+    return None, np.column_stack((hull.x, hull.y))
+
+def _graham_trial(points):
+    from graham_scan_trial import graham_scan
+    return None, graham_scan(points)
+
+def _jarvis(points):
+    from jarvis_march_trial import jarvis_march
+    return None, jarvis_march(points)
+
+def _merge_hull(points):
+    from merge_hull_trial import divide
+    return None, np.array(divide(sorted(points.tolist())))
+
+# quick_hall_trial.quickhull splits at the leftmost and rightmost point and fails when
+# they are the same, so repeated points are dropped first and points on one vertical
+# line go to the monotone chain.
+def _quickhull(points):
+    import quick_hall_trial
+    points = np.unique(points, axis=0)
+    if points[0, 0] == points[-1, 0]:
+        return None, points[monotone_chain(points)[0]]
+    try:
+        return None, quick_hall_trial.quickhull(points.tolist())
+    finally:
+        # find_hull records animation frames on every call; do not let them pile up.
+        quick_hall_trial.frames.clear()
+
+def _parallel(points):
+    from parallel_hull import parallel_hull
+    return parallel_hull(points)
+
+# Algorithm registry: name -> adapter. More engines can be registered by adding an
+# adapter with the same contract.
+ALGORITHMS = {
+    'graham': _graham,
+    'graham_trial': _graham_trial,
+    'monotone_chain': monotone_chain,
+    'jarvis': _jarvis,
+    'merge_hull': _merge_hull,
+    'quickhull': _quickhull,
+    'quickhull_iterative': quickhull_iterative,
+    'chan': chan,
+    'kirkpatrick_seidel': kirkpatrick_seidel,
+    'parallel': _parallel,
+}
+
+# Rough hull size estimate from an evenly strided sample of the points. The sample
+# hull size is scaled up as if the points filled a disk (h ~ n^(1/3)), the fastest
+# growing of the usual random distributions, so the estimate errs on the large side;
+# points in convex position show up as a sample that is mostly hull.
+def estimate_hull_size(points, sample_size=2048):
+    n = len(points)
+    if n <= sample_size:
+        return len(monotone_chain(points)[0])
+    sample = points[::n // sample_size]
+    h = len(monotone_chain(sample)[0])
+    if h * 2 > len(sample):
+        return n
+    return min(n, int(np.ceil(h * (n / len(sample)) ** (1 / 3))))
+
+# Picks the engine for method="auto". Small inputs and large hulls go to the monotone
+# chain, whose cost is dominated by one sort; when the hull is tiny compared to the
+# input, the iterative QuickHull only makes a few partition passes over the points
+# that the Akl-Toussaint prefilter left over.
+def choose_method(points):
+    n = len(points)
+    if n < 4096:
+        return 'monotone_chain', {}
+    estimated_h = estimate_hull_size(points)
+    stats = {'estimated_h': estimated_h}
+    if estimated_h * 256 <= n:
+        return 'quickhull_iterative', stats
+    return 'monotone_chain', stats
+
+# Rotates the vertices of a hull found by a coordinate-only algorithm into the common
+# order and drops collinear or repeated vertices, by one chain pass over the vertices.
+def _canonical(vertices, points):
+    vertices = np.asarray(vertices, dtype=points.dtype).reshape(-1, 2)
+    return vertices[monotone_chain(vertices)[0]]
+
+# Single entry point for all hull algorithms. `points` is anything np.asarray turns
+# into an (n, 2) array. `method` is a key of ALGORITHMS or "auto". With
+# prefilter=True the Akl-Toussaint prefilter runs first (method="auto" decides for
+# itself). With a `cache` (a hull_cache.HullCache) a result computed before for equal
+# points and options is returned from it (as a copy with stats {'cached': True}),
+# otherwise the new result is stored there.
+# Returns a HullResult.
+def convex_hull(points, method='auto', prefilter=False, cache=None):
+    points = as_points(points)
+    if cache is not None:
+        key = cache.key(points, method, prefilter)
+        result = cache.get(key)
+        if result is None:
+            result = convex_hull(points, method, prefilter)
+            cache.put(key, result)
+        return result
+    stats = {}
+    if method == 'auto':
+        method, stats = choose_method(points)
+        prefilter = method == 'quickhull_iterative'
+    if method not in ALGORITHMS:
+        raise ValueError(f"unknown hull method {method!r}, expected 'auto' or one of {sorted(ALGORITHMS)}")
+
+    candidates = None
+    if prefilter:
+        keep, removed = akl_toussaint(points)
+        stats['removed'] = removed
+        if removed:
+            candidates = np.flatnonzero(keep)
+    subset = points if candidates is None else points[candidates]
+
+    start_time = time.perf_counter()
+    if len(subset) < 3:
+        indices, vertices = monotone_chain(subset)
+    else:
+        indices, vertices = ALGORITHMS[method](subset)
+    stats['seconds'] = time.perf_counter() - start_time
+
+    if indices is None:
+        vertices = _canonical(vertices, points)
+    elif candidates is not None:
+        indices = candidates[indices]
+    return HullResult(vertices, indices, method, stats)
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    for distribution in ('uniform', 'gaussian'):
+        points = generate_points(distribution, 1000000)
+        result = convex_hull(points)
+        print(f"{distribution}: {result} {result.stats}")
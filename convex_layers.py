@@ -0,0 +1,114 @@
+import numpy as np
+import time
+from monotone_chain import as_points, cross, monotone_chain, prune_chain, sort_points
+from grouped_hull import group_chains
+from predicates import kernel_coordinates
+
+# Convex layers (onion peeling): layer 0 is the set of hull vertices, layer 1 the hull
+# vertices of what is left, and so on. Returns the layer of every point as an int
+# array; repeated points share a layer, and points on a hull edge between two
+# vertices go to a deeper layer, as they would when peeling with any of the hull
+# functions here.
+#
+# The points are sorted once. The sorted sequence is cut into buckets of
+# `bucket_size` consecutive points and the lower and upper chains of every bucket
+# are kept, all of them together in two sorted position arrays. Every hull vertex is
+# a vertex of its bucket's chains, so each layer is one prune_chain pass over those
+# candidates only. Peeling a layer changes the chains of the buckets it took points
+# from, and just those buckets are re-chained, all in one group_chains call.
+def convex_layers(points, bucket_size=128):
+    points = as_points(points)
+    n = len(points)
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    order = sort_points(points[:, 0], points[:, 1])
+    sx, sy, span = kernel_coordinates(points[order, 0], points[order, 1])
+    distinct = np.empty(n, dtype=bool)
+    distinct[0] = True
+    distinct[1:] = (sx[1:] != sx[:-1]) | (sy[1:] != sy[:-1])
+    representative = np.cumsum(distinct) - 1
+    sx, sy = sx[distinct], sy[distinct]
+
+    m = len(sx)
+    positions = np.arange(m)
+    lower, upper = group_chains(sx, sy, positions % bucket_size == 0, span)
+    alive = np.ones(m, dtype=bool)
+    layers = np.empty(m, dtype=np.intp)
+    layer = 0
+    remaining = m
+    while remaining:
+        # As in monotone_chain, only candidates below (above) the line through the
+        # first and last point can be on the lower (upper) chain, which goes left to
+        # right (right to left) turning left. The span of all the points bounds every
+        # difference, so the orientation tests use the static filter.
+        first, last = lower[0], lower[-1]
+        below = cross(sx[first], sy[first], sx[last], sy[last], sx[lower], sy[lower], span) < 0
+        above = cross(sx[first], sy[first], sx[last], sy[last], sx[upper], sy[upper], span) > 0
+        lower_chain = np.concatenate(([first], lower[below], [last]))
+        upper_chain = np.concatenate(([last], upper[above][::-1], [first]))
+        peeled = np.union1d(lower_chain[prune_chain(sx[lower_chain], sy[lower_chain], span)],
+                            upper_chain[prune_chain(sx[upper_chain], sy[upper_chain], span)])
+        alive[peeled] = False
+        layers[peeled] = layer
+        layer += 1
+        remaining -= len(peeled)
+
+        # Re-chain the buckets that lost points.
+        touched = np.unique(peeled // bucket_size)
+        lower = lower[~np.isin(lower // bucket_size, touched)]
+        upper = upper[~np.isin(upper // bucket_size, touched)]
+        members = (touched[:, None] * bucket_size + np.arange(bucket_size)).ravel()
+        members = members[members < m]
+        members = members[alive[members]]
+        if len(members):
+            buckets = members // bucket_size
+            new_bucket = np.empty(len(members), dtype=bool)
+            new_bucket[0] = True
+            new_bucket[1:] = buckets[1:] != buckets[:-1]
+            new_lower, new_upper = group_chains(sx[members], sy[members], new_bucket, span)
+            lower = _merge_sorted(lower, members[new_lower])
+            upper = _merge_sorted(upper, members[new_upper])
+
+    result = np.empty(n, dtype=np.intp)
+    result[order] = layers[representative]
+    return result
+
+# Inserts the sorted array b into the sorted array a (no common entries).
+def _merge_sorted(a, b):
+    return np.insert(a, np.searchsorted(a, b), b)
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 1000000)
+
+    start_time = time.perf_counter()
+    layers = convex_layers(points)
+    end_time = time.perf_counter()
+    print(f"{layers.max() + 1} layers, outermost layer: {points[layers == 0]}")
+
+    print(f"Convex layers took {end_time - start_time} seconds for {len(points)} points")
+
+    # Check the peeling against repeated monotone_chain calls on the points that are
+    # left, on grid points and on points a few ulps off a line.
+    t = np.random.uniform(0, 1, 2000)
+    nearly_collinear = np.column_stack((0.5 + t * 11.5, 0.5 + t * 11.5))
+    nearly_collinear[:, 1] += np.random.randint(-2, 3, len(t)) * np.spacing(nearly_collinear[:, 1])
+    for name, sample in (('grid', np.random.randint(0, 20, (2000, 2)).astype(float)),
+                         ('nearly collinear', nearly_collinear)):
+        layers = convex_layers(sample, bucket_size=16)
+        expected = np.empty(len(sample), dtype=np.intp)
+        left = np.arange(len(sample))
+        layer = 0
+        while len(left):
+            hull = sample[left[monotone_chain(sample[left])[0]]]
+            on_hull = (sample[left, None] == hull[None]).all(axis=2).any(axis=1)
+            expected[left[on_hull]] = layer
+            left = left[~on_hull]
+            layer += 1
+        print(f"{np.count_nonzero(layers != expected)} {name} points were put in the wrong layer")
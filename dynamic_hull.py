@@ -0,0 +1,397 @@
+import numpy as np
+import time
+from bisect import bisect_left, bisect_right
+from monotone_chain import as_points, monotone_chain, sort_points
+from incremental_hull import chain_splice, join_chains, orient, split_chains
+
+# A run of points that are consecutive in lexicographic order, with its own lower and
+# upper chain. `points` counts the copies of every point in the bucket.
+class _Bucket:
+    __slots__ = ('points', 'lower', 'upper')
+
+    def __init__(self, points):
+        self.points = points
+        self.rebuild()
+
+    # Computes the chains from scratch.
+    def rebuild(self):
+        if self.points:
+            self.lower, self.upper = split_chains(monotone_chain(list(self.points))[1])
+        else:
+            self.lower, self.upper = [], []
+
+    # Takes the last copy of p out of the chains after it was removed from `points`.
+    # The vertex is replaced by the chain of the points between its neighbours (or
+    # beyond its one neighbour, at an end of the chain), the only points that can take
+    # its place. Returns, for the lower and the upper chain, None if it did not change
+    # or the lengths of the prefix and suffix it kept.
+    def remove(self, p):
+        changes = []
+        for chain, sign in ((self.lower, 1), (self.upper, -1)):
+            t = bisect_left(chain, p)
+            if t == len(chain) or chain[t] != p:
+                changes.append(None)
+                continue
+            low, high = chain[t - 1:t], chain[t + 1:t + 2]
+            between = sorted(q for q in self.points
+                             if (not low or low[0] < q) and (not high or q < high[0])
+                             and (not low or not high or sign * orient(low[0], high[0], q) < 0))
+            piece = _chain(low + between + high, sign)
+            changes.append((t, len(chain) - t - 1))
+            chain[t:t + 1] = piece[len(low):len(piece) - len(high)]
+        return changes
+
+    def is_vertex(self, p):
+        return _contains(self.lower, p) or _contains(self.upper, p)
+
+def _contains(chain, p):
+    i = bisect_left(chain, p)
+    return i < len(chain) and chain[i] == p
+
+# Chain of sorted points, as in the monotone chain: points that do not make a strict
+# turn towards the hull side are popped.
+def _chain(points, sign):
+    chain = []
+    for p in points:
+        while len(chain) >= 2 and sign * orient(chain[-2], chain[-1], p) <= 0:
+            chain.pop()
+        chain.append(p)
+    return chain
+
+# Bridge of two lexicographically separated chains (every point of `left` before every
+# point of `right`), found by walking both ends inwards as in merge_hull_trial.merger,
+# moving whichever end does not make a strict turn with the other, until neither
+# moves. Returns (i, j) for the chain left[:i + 1] + right[j:]. Linear in the worst
+# case; only used to build a tree from scratch, when every chain is visited anyway.
+def walk_bridge(left, right, sign):
+    i = len(left) - 1
+    j = 0
+    moved = True
+    while moved:
+        moved = False
+        while i > 0 and sign * orient(left[i - 1], left[i], right[j]) <= 0:
+            i -= 1
+            moved = True
+        while j < len(right) - 1 and sign * orient(left[i], right[j], right[j + 1]) <= 0:
+            j += 1
+            moved = True
+    return i, j
+
+# Last index in lo..hi at which `test` holds, for a test that holds from lo up to some
+# index and fails after it (test(lo) is taken to hold). Gallops away from `guess` in
+# steps of doubling size and then bisects, so it takes O(log d) tests when the answer
+# is d places from the guess.
+def _last_true(test, lo, hi, guess):
+    guess = min(max(guess, lo), hi)
+    step = 1
+    if guess == lo or test(guess):
+        lo = guess
+        while lo + step <= hi and test(lo + step):
+            lo += step
+            step *= 2
+        hi = min(hi, lo + step - 1)
+    else:
+        hi = guess - 1
+        while hi - step >= lo:
+            if test(hi - step + 1):
+                lo = hi - step + 1
+                break
+            hi -= step
+            step *= 2
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if test(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+# The lower (sign=1) or upper (sign=-1) chains of a row of buckets, merged up a
+# segment tree in the manner of Overmars and van Leeuwen. The tree is stored as in a
+# binary heap: node 1 is the root and the leaves, the bucket chains themselves, start
+# at `size`. A node keeps no chain of its own, only its bridge: the first cut[node]
+# points of its left child's chain followed by the last keep[node] points of its right
+# child's chain. The k-th point of any node's chain is found by walking down to a
+# leaf, and the chains are shared instead of copied.
+class _ChainTree:
+    __slots__ = ('sign', 'size', 'leaves', 'cut', 'keep', 'length')
+
+    def __init__(self, chains, sign):
+        self.sign = sign
+        self.size = 1
+        while self.size < len(chains):
+            self.size *= 2
+        self.leaves = list(chains) + [[] for _ in range(self.size - len(chains))]
+        self.cut = [0] * self.size
+        self.keep = [0] * self.size
+        self.length = [0] * self.size + [len(chain) for chain in self.leaves]
+        # Built bottom-up on temporary copies of the merged chains, which are dropped
+        # once the level above has been merged.
+        merged = [None] * self.size + self.leaves
+        for node in range(self.size - 1, 0, -1):
+            left, right = merged[2 * node], merged[2 * node + 1]
+            if left and right:
+                i, j = walk_bridge(left, right, sign)
+                merged[node] = left[:i + 1] + right[j:]
+                self.cut[node], self.keep[node] = i + 1, len(right) - j
+            else:
+                merged[node] = left + right
+                self.cut[node], self.keep[node] = len(left), len(right)
+            self.length[node] = len(merged[node])
+            merged[2 * node] = merged[2 * node + 1] = None
+
+    # The k-th point of the chain of `node`.
+    def at(self, node, k):
+        size, cut = self.size, self.cut
+        while node < size:
+            node *= 2
+            a = cut[node >> 1]
+            if k >= a:
+                k += self.length[node + 1] - self.keep[node >> 1] - a
+                node += 1
+        return self.leaves[node - size][k]
+
+    # The root chain as a list of points, from slices of the leaves.
+    def chain(self):
+        points = []
+        self._collect(1, 0, self.length[1], points)
+        return points
+
+    def _collect(self, node, start, stop, points):
+        if start >= stop:
+            return
+        if node >= self.size:
+            points.extend(self.leaves[node - self.size][start:stop])
+            return
+        a = self.cut[node]
+        self._collect(2 * node, start, min(stop, a), points)
+        shift = self.length[2 * node + 1] - self.keep[node] - a
+        self._collect(2 * node + 1, max(start, a) + shift, stop + shift, points)
+
+    # Takes the new chain of leaf k, which shares its first `prefix` and last `suffix`
+    # points with the old one, and fixes the bridges above it. Stops at the first node whose chain comes out the same, which also
+    # leaves every node above it the same. Returns True if the root chain changed.
+    def update(self, k, chain, prefix, suffix):
+        node = self.size + k
+        self.leaves[k] = chain
+        self.length[node] = len(chain)
+        while node > 1:
+            child, node = node, node // 2
+            a, b = self.cut[node], self.keep[node]
+            cut, keep = self.bridge(node)
+            if child == 2 * node:
+                same = prefix >= cut
+                prefix, suffix = min(prefix, a, cut), min(b, keep)
+            else:
+                same = suffix >= keep
+                prefix, suffix = min(a, cut), min(suffix, b, keep)
+            self.cut[node], self.keep[node] = cut, keep
+            self.length[node] = cut + keep
+            if same and (cut, keep) == (a, b):
+                return False
+        return True
+
+    # (cut, keep) of the bridge between the two children of `node`. The stored bridge is
+    # kept if it still passes the local test of _is_bridge.
+    def bridge(self, node):
+        left, right = 2 * node, 2 * node + 1
+        n, m = self.length[left], self.length[right]
+        if not n or not m:
+            return n, m
+        if self._is_bridge(node, self.cut[node] - 1, m - self.keep[node]):
+            return self.cut[node], self.keep[node]
+
+        # Nested binary search. For a point q of the right chain, the tangent from q
+        # touches the left chain at the last i whose edge (i - 1, i) q lies strictly on
+        # the outer side of. The bridge starts at the first j of the right chain whose
+        # next point lies strictly on the hull side of the line from that tangent point
+        # through q; the points before it lie on or outside that line, the ones after
+        # it inside. Collinear points on the bridge are left out at both ends. Both
+        # searches start from the old bridge, which has rarely moved far.
+        sign, at = self.sign, self.at
+        guess = self.cut[node] - 1
+
+        def tangent(q):
+            nonlocal guess
+            guess = _last_true(lambda i: sign * orient(at(left, i - 1), at(left, i), q) > 0,
+                               0, n - 1, guess)
+            return guess
+
+        def outside(j):
+            q = at(right, j)
+            return sign * orient(at(left, tangent(q)), q, at(right, j + 1)) <= 0
+
+        j = _last_true(lambda j: j < m - 1 and outside(j), -1, m - 1,
+                       m - self.keep[node] - 1) + 1
+        return tangent(at(right, j)) + 1, m - j
+
+    # Whether the segment from point i of the left child's chain to point j of the
+    # right one is their bridge: the four neighbours lie on its hull side, the outer
+    # two strictly, so that no collinear point is left at either end.
+    def _is_bridge(self, node, i, j):
+        left, right = 2 * node, 2 * node + 1
+        n, m = self.length[left], self.length[right]
+        if not (0 <= i < n and 0 <= j < m):
+            return False
+        sign, at = self.sign, self.at
+        p, q = at(left, i), at(right, j)
+        return ((i == 0 or sign * orient(p, q, at(left, i - 1)) > 0)
+                and (i == n - 1 or sign * orient(p, q, at(left, i + 1)) >= 0)
+                and (j == m - 1 or sign * orient(p, q, at(right, j + 1)) > 0)
+                and (j == 0 or sign * orient(p, q, at(right, j - 1)) >= 0))
+
+# Fully dynamic convex hull of a multiset of points, after Overmars and van Leeuwen.
+# The points are cut into buckets of consecutive points in lexicographic order, each
+# with its own lower and upper chain, and a _ChainTree per side merges the bucket
+# chains into the hull through the bridges stored at its nodes.
+#
+# An update changes at most one bucket's chains and then checks the bridges on the
+# path to the root, stopping at the first node that comes out the same. A bridge that
+# still holds costs four orientation tests; one that moved is found by a nested binary
+# search over the two child chains. No chain is copied, so an update takes O(log^2 h)
+# point lookups of O(log(buckets)) steps each per node, plus the bucket work: a
+# binary-searched test for an inserted point, a count update for a deleted point that
+# is not a bucket vertex, and a scan of the bucket for a deleted vertex. Buckets that
+# grow past 2 * bucket_size are split and empty buckets are dropped, after which the
+# trees are rebuilt in O(h log(buckets)); a split follows bucket_size inserts into
+# one bucket, so this is rare. The hull is materialized when it is read. On 1M points,
+# alternating inserts and deletes run at about 100k updates/s for uniform points (h
+# about 35) and about 25k updates/s for points near a circle (h about 60k).
+class DynamicHull:
+    __slots__ = ('buckets', 'bounds', 'lower', 'upper', 'count', '_hull')
+
+    bucket_size = 1024
+
+    def __init__(self, points=None):
+        self.count = 0
+        self._build([] if points is None else as_points(points))
+
+    def __len__(self):
+        return len(self.hull)
+
+    # Current hull as an (h, 2) array in the same order as monotone_chain, cached
+    # between updates.
+    @property
+    def hull(self):
+        if self._hull is None:
+            self._hull = join_chains(self.lower.chain(), self.upper.chain())
+        return self._hull
+
+    # Inserts one point and returns True if the hull changed.
+    def insert(self, point):
+        p = (float(point[0]), float(point[1]))
+        k = self._bucket(p)
+        if k is None:
+            self._build(np.array([p]))
+            return True
+        bucket = self.buckets[k]
+        self.count += 1
+        copies = bucket.points.get(p, 0)
+        bucket.points[p] = copies + 1
+        if copies:
+            return False
+        lower = chain_splice(bucket.lower, p, 1)
+        upper = chain_splice(bucket.upper, p, -1)
+        changed = False
+        for tree, chain, splice in ((self.lower, bucket.lower, lower), (self.upper, bucket.upper, upper)):
+            if splice is not None:
+                changed = tree.update(k, chain, splice[0], len(chain) - splice[0] - 1) or changed
+        if changed:
+            self._hull = None
+        if len(bucket.points) > 2 * self.bucket_size:
+            self._split(k)
+        return changed
+
+    # Deletes one copy of a point and returns True if the hull changed. Raises KeyError
+    # if the point is not present.
+    def delete(self, point):
+        p = (float(point[0]), float(point[1]))
+        k = self._bucket(p)
+        bucket = None if k is None else self.buckets[k]
+        if bucket is None or p not in bucket.points:
+            raise KeyError(p)
+        self.count -= 1
+        copies = bucket.points.pop(p)
+        if copies > 1:
+            bucket.points[p] = copies - 1
+            return False
+        if not bucket.is_vertex(p):
+            return False
+        if not bucket.points:
+            del self.buckets[k]
+            self.bounds = [b.lower[0] for b in self.buckets[1:]]
+            self._rebuild_tree()
+            return True
+        changed = False
+        lower, upper = bucket.remove(p)
+        for tree, chain, kept in ((self.lower, bucket.lower, lower), (self.upper, bucket.upper, upper)):
+            if kept is not None:
+                changed = tree.update(k, chain, *kept) or changed
+        if changed:
+            self._hull = None
+        return changed
+
+    def extend(self, points):
+        for point in as_points(points).tolist():
+            self.insert(point)
+
+    # Bucket that p belongs to, or None while the structure is empty.
+    def _bucket(self, p):
+        if not self.buckets:
+            return None
+        return bisect_right(self.bounds, p)
+
+    # Sorts the points once, counts repeated points and cuts them into buckets.
+    def _build(self, points):
+        self.count += len(points)
+        points = np.asarray(points, dtype=np.float64)
+        if len(points):
+            points = points[sort_points(points[:, 0], points[:, 1])]
+        counts = {}
+        for p in map(tuple, points.tolist()):
+            counts[p] = counts.get(p, 0) + 1
+        items = list(counts.items())
+        self.buckets = [_Bucket(dict(items[start:start + self.bucket_size]))
+                        for start in range(0, len(items), self.bucket_size)]
+        self.bounds = [bucket.lower[0] for bucket in self.buckets[1:]]
+        self._rebuild_tree()
+
+    def _split(self, k):
+        items = sorted(self.buckets[k].points.items())
+        half = len(items) // 2
+        self.buckets[k:k + 1] = [_Bucket(dict(items[:half])), _Bucket(dict(items[half:]))]
+        self.bounds = [bucket.lower[0] for bucket in self.buckets[1:]]
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        self.lower = _ChainTree([bucket.lower for bucket in self.buckets], 1)
+        self.upper = _ChainTree([bucket.upper for bucket in self.buckets], -1)
+        self._hull = None
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 1000000)
+    updates = generate_points('uniform', 100000)
+
+    start_time = time.perf_counter()
+    dynamic = DynamicHull(points)
+    end_time = time.perf_counter()
+    print(f"Building over {len(points)} points took {end_time - start_time} seconds")
+
+    start_time = time.perf_counter()
+    for added, removed in zip(updates.tolist(), points.tolist()):
+        dynamic.insert(added)
+        dynamic.delete(removed)
+    end_time = time.perf_counter()
+    print(dynamic.hull)
+
+    print(f"{2 * len(updates)} updates took {end_time - start_time} seconds "
+          f"({2 * len(updates) / (end_time - start_time):.0f} updates/s)")
+    live = np.concatenate((updates, points[len(updates):]))
+    same = np.array_equal(dynamic.hull, monotone_chain(live)[1])
+    print(f"Hull after the updates {'matches' if same else 'DIFFERS FROM'} monotone_chain")
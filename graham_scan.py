@@ -1,18 +1,47 @@
-# A Python3 program to find convex hull of a set of points. Refer 
+# A Python3 program to find convex hull of a set of points. Refer
 # https://www.geeksforgeeks.org/orientation-3-ordered-points/
 # for explanation of orientation()
 
+import numpy as np
+import hull_stats
 from functools import cmp_to_key
+from predicates import kernel_coordinates, orient2d, orient2d_batch, static_bound
 
 # A class used to store the x and y coordinates of points
 class Point:
+	__slots__ = ('x', 'y')
+
 	def __init__(self, x = None, y = None):
 		self.x = x
 		self.y = y
 
-# A global point needed for sorting points with reference
-# to the first point
-p0 = Point(0, 0)
+# A struct-of-arrays container for many points: one array of x
+# and one array of y coordinates instead of a Point per point
+class Points:
+	__slots__ = ('x', 'y')
+
+	def __init__(self, x, y):
+		self.x = np.asarray(x)
+		self.y = np.asarray(y)
+
+	def __len__(self):
+		return len(self.x)
+
+	def __getitem__(self, i):
+		return Point(self.x[i], self.y[i])
+
+	def __iter__(self):
+		return map(Point, self.x.tolist(), self.y.tolist())
+
+# Converts a list of Point objects or an (n, 2) array
+# to the struct-of-arrays form
+def toPoints(points):
+	if isinstance(points, Points):
+		return points
+	if len(points) and isinstance(points[0], Point):
+		return Points([p.x for p in points], [p.y for p in points])
+	points = np.asarray(points)
+	return Points(points[:, 0], points[:, 1])
 
 # A utility function to find next to top in a stack
 def nextToTop(S):
@@ -29,113 +58,151 @@ def distSq(p1, p2):
 # 0 --> p, q and r are collinear
 # 1 --> Clockwise
 # 2 --> Counterclockwise
+# The sign is exact, see predicates.orient2d
 def orientation(p, q, r):
-	val = ((q.y - p.y) * (r.x - q.x) -
-		(q.x - p.x) * (r.y - q.y))
+	val = orient2d(p.x, p.y, q.x, q.y, r.x, r.y)
 	if val == 0:
 		return 0 # collinear
-	elif val > 0:
+	elif val < 0:
 		return 1 # clock wise
 	else:
 		return 2 # counterclock wise
 
-# A function used by cmp_to_key function to sort an array of
-# points with respect to the first point
-def compare(p1, p2):
-
-	# Find orientation
-	o = orientation(p0, p1, p2)
-	if o == 0:
-		if distSq(p0, p2) >= distSq(p0, p1):
-			return -1
+# The pseudo-angles are computed from rounded offsets, so
+# points at nearly the same angle may be out of order. Any
+# such points are neighbours whose angles differ by less
+# than ANGLE_TOLERANCE (exactly equal angles included), so
+# only those pairs are checked, all at once, with exact
+# orientation tests, nearer points first on a tie. The rare
+# runs of close angles with a pair out of order are sorted
+# again one by one. Returns the reordered indices
+ANGLE_TOLERANCE = 1e-12
+
+def exactOrder(x, y, first, others, angle):
+	close = np.flatnonzero(np.diff(angle) < ANGLE_TOLERANCE)
+	if len(close) == 0:
+		return others
+	x0, y0 = x[first], y[first]
+	xi, yi = x[others[close]], y[others[close]]
+	xj, yj = x[others[close + 1]], y[others[close + 1]]
+	turn = orient2d_batch(x0, y0, xi, yi, xj, yj)
+	# Same direction: the nearer point has its coordinates
+	# between the first point's and the other one's
+	nearer = np.where(xi > x0, xi <= xj, np.where(xi < x0, xi >= xj, yi <= yj))
+	wrong = (turn < 0) | ((turn == 0) & ~nearer)
+	if not wrong.any():
+		return others
+
+	def compare(i, j):
+		turn = orient2d(x0, y0, x[i], y[i], x[j], y[j])
+		if turn != 0:
+			return -1 if turn > 0 else 1
+		if x[i] == x[j] and y[i] == y[j]:
+			return 0
+		if x[i] != x0:
+			nearer = (x[i] < x[j]) == (x[i] > x0)
 		else:
-			return 1
-	else:
-		if o == 2:
-			return -1
-		else:
-			return 1
-
-# Prints convex hull of a set of n points.
+			nearer = y[i] < y[j]
+		return -1 if nearer else 1
+
+	others = others.copy()
+	run = np.cumsum(np.diff(close, prepend=-2) != 1) - 1
+	starts = close[np.flatnonzero(np.diff(close, prepend=-2) != 1)]
+	ends = close[np.flatnonzero(np.diff(close, append=len(angle)) != 1)] + 2
+	for r in np.unique(run[wrong]).tolist():
+		start, end = starts[r], ends[r]
+		others[start:end] = sorted(others[start:end].tolist(), key=cmp_to_key(compare))
+	return others
+
+# Returns the convex hull of the first n points as Points in
+# counterclockwise order, starting from the bottom-most point.
+# The points can be a list of Point, Points or an (n, 2) array.
 def convexHull(points, n):
-
-	# Find the bottommost point
-	ymin = points[0].y
-	min = 0
-	for i in range(1, n):
-		y = points[i].y
-
-		# Pick the bottom-most or choose the left
-		# most point in case of tie
-		if ((y < ymin) or
-			(ymin == y and points[i].x < points[min].x)):
-			ymin = points[i].y
-			min = i
-
-	# Place the bottom-most point at first position
-	points[0], points[min] = points[min], points[0]
-
-	# Sort n-1 points with respect to the first point.
-	# A point p1 comes before p2 in sorted output if p2
-	# has larger polar angle (in counterclockwise
-	# direction) than p1
-	p0 = points[0]
-	points = sorted(points, key=cmp_to_key(compare))
-
-	# If two or more points make same angle with p0,
-	# Remove all but the one that is farthest from p0
-	# Remember that, in above sorting, our criteria was
-	# to keep the farthest point at the end when more than
-	# one points have same angle.
-	m = 1 # Initialize size of modified array
-	for i in range(1, n):
-	
-		# Keep removing i while angle of i and i+1 is same
-		# with respect to p0
-		while ((i < n - 1) and
-		(orientation(p0, points[i], points[i + 1]) == 0)):
-			i += 1
-
-		points[m] = points[i]
-		m += 1 # Update size of modified array
+	points = toPoints(points)
+	# Integer coordinates are kept exact, anything else
+	# becomes float64, see predicates.kernel_coordinates
+	x, y, span = kernel_coordinates(points.x[:n], points.y[:n])
+
+	# Find the bottommost point, picking the left most
+	# point in case of tie
+	lowest = np.flatnonzero(y == y.min())
+	first = lowest[np.argmin(x[lowest])]
+	x0, y0 = x[first], y[first]
+
+	# Every other point as an offset from the first one.
+	# Copies of the first point have no angle and are left out
+	dx = x - x0
+	dy = y - y0
+	others = np.flatnonzero((dx != 0) | (dy != 0))
+	dx, dy = dx[others], dy[others]
+
+	# Sort the points by polar angle with respect to the first
+	# point, nearer points first when the angle is the same.
+	# All offsets have dy >= 0, so the pseudo-angle
+	# 1 - dx / (|dx| + dy) grows monotonically with the angle
+	# and is computed for all points at once
+	angle = 1 - np.asarray(dx / (np.abs(dx) + dy), dtype=np.float64)
+	order = np.lexsort((np.asarray(dx * dx + dy * dy, dtype=np.float64), angle))
+	others, dx, dy = others[order], dx[order], dy[order]
+	others = exactOrder(x, y, first, others, angle[order])
+
+	# If two or more points make same angle with the first
+	# point, remove all but the one that is farthest from it.
+	# The sort put the farthest point last, so a point is
+	# dropped when it has the same angle as the next one
+	keep = np.ones(len(dx), dtype=bool)
+	keep[:-1] = orient2d_batch(x0, y0, x[others[:-1]], y[others[:-1]],
+		x[others[1:]], y[others[1:]]) != 0
+	others, dx, dy = others[keep], dx[keep], dy[keep]
 
 	# If modified array of points has less than 3 points,
 	# convex hull is not possible
-	if m < 3:
+	if len(dx) < 2:
 		return
 
-	# Create an empty stack and push first three points
-	# to it.
-	S = []
-	S.append(points[0])
-	S.append(points[1])
-	S.append(points[2])
+	# Create a stack with the first point and the first
+	# candidate, then process remaining points in order.
+	# A turn is decided by the float cross product when it
+	# is above the static error bound and by orient2d below it
+	candidates = np.concatenate(([first], others))
+	px = x[candidates].tolist()
+	py = y[candidates].tolist()
+	bound = static_bound(span)
+	stats = hull_stats.active
+	S = [0, 1]
+	for i in range(2, len(px)):
 
-	# Process remaining n-3 points
-	for i in range(3, m):
-	
 		# Keep removing top while the angle formed by
 		# points next-to-top, top, and points[i] makes
 		# a non-left turn
-		while ((len(S) > 1) and
-		(orientation(nextToTop(S), S[-1], points[i]) != 2)):
+		while len(S) > 1:
+			if stats is not None:
+				stats.add('orientation_tests')
+			a, b = nextToTop(S), S[-1]
+			turn = ((px[b] - px[a]) * (py[i] - py[a]) -
+				(py[b] - py[a]) * (px[i] - px[a]))
+			if turn > bound or (turn >= -bound and
+				orient2d(px[a], py[a], px[b], py[b], px[i], py[i]) > 0):
+				break
 			S.pop()
-		S.append(points[i])
+		S.append(i)
 
-	# Now stack has the output points,
-	# print contents of stack
-	while S:
-		p = S[-1]
-		print("(" + str(p.x) + ", " + str(p.y) + ")")
-		S.pop()
+	# Now stack has the output points; every
+	# candidate was pushed once, the rest were popped
+	if stats is not None:
+		stats.add('stack_pops', len(px) - len(S))
+	hull = candidates[S]
+	return Points(x[hull], y[hull])
 
 # Driver Code
-input_points = [(0, 3), (1, 1), (2, 2), (4, 4),
-				(0, 0), (1, 2), (3, 1), (3, 3)]
-points = []
-for point in input_points:
-	points.append(Point(point[0], point[1]))
-n = len(points)
-convexHull(points, n)
+if __name__ == "__main__":
+	input_points = [(0, 3), (1, 1), (2, 2), (4, 4),
+					(0, 0), (1, 2), (3, 1), (3, 3)]
+	points = []
+	for point in input_points:
+		points.append(Point(point[0], point[1]))
+	n = len(points)
+	for p in convexHull(points, n):
+		print("(" + str(p.x) + ", " + str(p.y) + ")")
 
 # This code is contributed by Kevin Joshi
@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import gc  # Garbage collector interface
+import hull_stats
+from predicates import orient2d_points
 
 def generate_points(distribution, n):
     if distribution == 'gaussian':
@@ -10,7 +12,10 @@ def generate_points(distribution, n):
 
 def graham_scan(points):
     # Sort the points lexicographically (tuples compare lexicographically).
-    points = sorted(points, key=lambda point: (point[0], point[1]))
+    # They are turned into tuples of plain Python numbers first: integer coordinates
+    # become Python ints, whose products never overflow, so for them cross is exact
+    # integer arithmetic, and floats skip the NumPy scalar overhead.
+    points = sorted(map(tuple, np.asarray(points).tolist()))
 
     # Boring case: no points or a single point, possibly repeated multiple times.
     if len(points) <= 1:
@@ -19,8 +24,11 @@ def graham_scan(points):
     # 2D cross product of OA and OB vectors, i.e. z-component of their 3D cross product.
     # Returns a positive value, if OAB makes a counter-clockwise turn,
     # negative for clockwise turn, and zero if the points are collinear.
-    def cross(o, a, b):
-        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+    # The sign is exact, see predicates.orient2d.
+    cross = orient2d_points
+    stats = hull_stats.active
+    if stats is not None:
+        cross = stats.counted(cross)
 
     # Build lower hull 
     lower = []
@@ -36,6 +44,10 @@ def graham_scan(points):
             upper.pop()
         upper.append(p)
 
+    # Every point was appended to each half once, so the ones missing were popped.
+    if stats is not None:
+        stats.add('stack_pops', 2 * len(points) - len(lower) - len(upper))
+
     # Concatenate lower and upper hull to make the full hull. The last point of each half is omitted because it's repeated at the beginning of the other half.
     full_hull = lower[:-1] + upper[:-1]
     
@@ -54,7 +66,8 @@ def visualize(points, hull):
     plt.show()
 
 
-points = generate_points('uniform', 100)
-hull = graham_scan(points)
-print(hull)
-"""visualize(points, hull)"""
+if __name__ == '__main__':
+    points = generate_points('uniform', 100)
+    hull = graham_scan(points)
+    print(hull)
+    """visualize(points, hull)"""
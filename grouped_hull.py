@@ -0,0 +1,184 @@
+import numpy as np
+import time
+from monotone_chain import as_points, cross, monotone_chain
+from predicates import kernel_coordinates, orient2d
+
+# Order of the points by (group, x, y). Stable sorts and np.lexsort are several times
+# slower than the default quicksort, so the points are sorted once by x and once by a
+# single int64 key made of the group code and the rank in x, which is unique. The y
+# key is only needed when two points of a group share an x value.
+def sort_groups(xs, ys, groups):
+    n = len(xs)
+    if groups.dtype.kind in 'iu' and groups.min() >= 0 and groups.max() < np.iinfo(np.int64).max // max(n, 1):
+        codes = groups.astype(np.int64)
+    else:
+        codes = np.unique(groups, return_inverse=True)[1].astype(np.int64)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.argsort(xs)] = np.arange(n)
+    order = np.argsort(codes * n + rank)
+    sx = xs[order]
+    sg = groups[order]
+    if np.any((sx[1:] == sx[:-1]) & (sg[1:] == sg[:-1])):
+        order = np.lexsort((ys, xs, groups))
+    return order
+
+# Segmented version of the classic stack pass: the chains are stored back to back
+# and `first` marks the entry each chain starts with.
+def _stack_segments(cx, cy, first, sign):
+    px = cx.tolist()
+    py = cy.tolist()
+    stack = [0] * len(px)
+    top = 0
+    base = 0
+    for i, starts in enumerate(first.tolist()):
+        if starts:
+            base = top
+        while top - base >= 2:
+            o, a = stack[top - 2], stack[top - 1]
+            if sign * orient2d(px[o], py[o], px[a], py[a], px[i], py[i]) > 0:
+                break
+            top -= 1
+        stack[top] = i
+        top += 1
+    return np.array(stack[:top], dtype=np.intp)
+
+# monotone_chain.prune_chain over many chains at once. The chains are stored back to
+# back, sorted and free of repeated points, `first` marks the entry each one starts
+# with and `sign` is 1 for lower chains (strict left turns) or -1 for upper chains.
+# Each pass drops, in every chain at the same time, the interior entries that do not
+# make a strict turn. Only the neighbours of dropped entries can change their turn, so
+# after the first pass only those are tested again. Chains that keep losing one entry
+# at a time would take many passes; once a few passes in a row remove less than
+# 1/1024 of the entries the survivors go through the stack pass instead. Returns the
+# positions of the surviving entries. `span` bounds every coordinate difference
+# and selects the static filter of the orientation tests, as in prune_chain.
+def prune_segments(cx, cy, first, sign, span=None):
+    positions = np.arange(len(cx))
+    last = np.empty(len(first), dtype=bool)
+    last[:-1] = first[1:]
+    last[-1:] = True
+    # The first pass tests every entry, with slices instead of gathers.
+    turns = sign * cross(cx[:-2], cy[:-2], cx[1:-1], cy[1:-1], cx[2:], cy[2:], span) > 0
+    dropped = np.flatnonzero(~turns & ~first[1:-1] & ~last[1:-1]) + 1
+    slow_passes = 0
+    while len(dropped):
+        keep = np.ones(len(positions), dtype=bool)
+        keep[dropped] = False
+        neighbours = np.zeros(len(positions), dtype=bool)
+        neighbours[dropped - 1] = True
+        neighbours[dropped + 1] = True
+        positions, cx, cy, first, last = positions[keep], cx[keep], cy[keep], first[keep], last[keep]
+        if len(dropped) < len(positions) >> 10:
+            slow_passes += 1
+            if slow_passes == 8:
+                return positions[_stack_segments(cx, cy, first, sign)]
+        check = np.flatnonzero(neighbours[keep] & ~first & ~last)
+        turns = sign * cross(cx[check - 1], cy[check - 1], cx[check], cy[check],
+                             cx[check + 1], cy[check + 1], span) > 0
+        dropped = check[~turns]
+    return positions
+
+# Lower and upper chains of groups of points that are already sorted by (group, x, y)
+# and free of repeated points within a group; `new_group` marks the first point of
+# every group. Returns the positions of the lower chain and of the upper chain
+# entries, both running left to right within each group, group after group. `span`
+# bounds the coordinate differences of all the points (see prune_segments).
+def group_chains(sx, sy, new_group, span=None):
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], len(sx)) - 1
+    sizes = ends - starts + 1
+    is_last = np.zeros(len(sx), dtype=bool)
+    is_last[ends] = True
+
+    # As in monotone_chain, a point below the line from the first to the last point of
+    # its group can only be on the lower chain and one above it only on the upper one.
+    fx, fy = np.repeat(sx[starts], sizes), np.repeat(sy[starts], sizes)
+    lx, ly = np.repeat(sx[ends], sizes), np.repeat(sy[ends], sizes)
+    side = cross(fx, fy, lx, ly, sx, sy, span)
+    ends_of_chain = new_group | is_last
+    lower = np.flatnonzero((side < 0) | ends_of_chain)
+    upper = np.flatnonzero((side > 0) | ends_of_chain)
+    lower = lower[prune_segments(sx[lower], sy[lower], new_group[lower], 1, span)]
+    upper = upper[prune_segments(sx[upper], sy[upper], new_group[upper], -1, span)]
+    return lower, upper
+
+# Convex hulls of many groups of points in one go. `groups` holds a group label for
+# every point. The points are sorted once by (group, x, y) and the lower and upper
+# chains of all groups are pruned together, so the cost is a few vector passes over
+# all points rather than one call per group. Returns (labels, offsets, indices) in
+# CSR form: the hull of group labels[g] is indices[offsets[g]:offsets[g + 1]], in
+# the same order as monotone_chain.
+def grouped_hull(points, groups):
+    points = as_points(points)
+    groups = np.asarray(groups)
+    if len(groups) != len(points):
+        raise ValueError("groups must have one label per point")
+    if len(points) == 0:
+        return groups[:0], np.zeros(1, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    order = sort_groups(points[:, 0], points[:, 1], groups)
+    sx, sy, span = kernel_coordinates(points[order, 0], points[order, 1])
+    sg = groups[order]
+
+    # Repeated points within a group are dropped up front, as in monotone_chain.
+    new_group = np.empty(len(order), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = sg[1:] != sg[:-1]
+    distinct = new_group.copy()
+    distinct[1:] |= (sx[1:] != sx[:-1]) | (sy[1:] != sy[:-1])
+    if not distinct.all():
+        order, sx, sy, sg, new_group = order[distinct], sx[distinct], sy[distinct], sg[distinct], new_group[distinct]
+
+    lower, upper = group_chains(sx, sy, new_group, span)
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], len(order)) - 1
+    group_of = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    is_first = new_group
+    is_last = np.zeros(len(order), dtype=bool)
+    is_last[ends] = True
+
+    # The hull of a group is its lower chain without the last point followed by its
+    # upper chain backwards without the first point; a group of one point is kept as
+    # it is. One stable sort by group puts the pieces together.
+    single = is_first & is_last
+    lower = lower[~is_last[lower] | single[lower]]
+    upper = upper[~is_first[upper]][::-1]
+    pieces = np.concatenate((lower, upper))
+    piece_groups = np.concatenate((group_of[lower], group_of[upper]))
+    hull = pieces[np.argsort(piece_groups, kind='stable')]
+
+    offsets = np.zeros(len(starts) + 1, dtype=np.intp)
+    np.cumsum(np.bincount(group_of[hull], minlength=len(starts)), out=offsets[1:])
+    return sg[starts], offsets, order[hull]
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 10000000)
+    groups = np.random.randint(0, 100000, len(points))
+
+    start_time = time.perf_counter()
+    labels, offsets, indices = grouped_hull(points, groups)
+    end_time = time.perf_counter()
+    print(points[indices[offsets[0]:offsets[1]]])
+
+    print(f"Grouped hull took {end_time - start_time} seconds for {len(points)} points "
+          f"in {len(labels)} groups ({len(points) / (end_time - start_time) / 1e6} M points/s)")
+
+    # Check every group against monotone_chain on degenerate groups: grid points with
+    # repeats and collinear runs, and points a few ulps off a line.
+    t = np.random.uniform(0, 1, 20000)
+    nearly_collinear = np.column_stack((0.5 + t * 11.5, 0.5 + t * 11.5))
+    nearly_collinear[:, 1] += np.random.randint(-2, 3, len(t)) * np.spacing(nearly_collinear[:, 1])
+    for name, sample in (('grid', np.random.randint(0, 8, (20000, 2)).astype(float)),
+                         ('nearly collinear', nearly_collinear)):
+        groups = np.random.randint(0, 500, len(sample))
+        labels, offsets, indices = grouped_hull(sample, groups)
+        wrong = sum(not np.array_equal(sample[indices[offsets[g]:offsets[g + 1]]],
+                                       monotone_chain(sample[groups == label])[1])
+                    for g, label in enumerate(labels.tolist()))
+        print(f"{wrong} of {len(labels)} {name} groups differ from monotone_chain")
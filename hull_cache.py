@@ -0,0 +1,152 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+import numpy as np
+from convex_hull import HullResult, convex_hull
+
+# Content-addressed LRU cache of HullResults, for convex_hull(..., cache=...). A result
+# is keyed by a hash of the points' bytes, dtype and shape and of the hull options,
+# so a repeated call on equal points costs one hashing pass instead of a hull, however
+# the array was produced. At most `max_entries` results and `max_bytes` bytes of
+# result arrays are kept in memory, evicting the least recently used first. With a
+# `directory`, every result is also written there as a .npy file and results missing
+# from memory are looked up on disk before counting as a miss; the disk tier is not
+# bounded. Cached arrays are shared between callers and are made read-only; every hit
+# is a new HullResult around them whose stats only say {'cached': True}, so the stats
+# of the run that filled the cache (its 'seconds', for one) are not handed out again.
+class HullCache:
+    __slots__ = ('max_entries', 'max_bytes', 'directory', 'entries', 'nbytes',
+                 'hits', 'misses', 'evictions', 'disk_hits')
+
+    def __init__(self, max_entries=256, max_bytes=64 << 20, directory=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return (f"HullCache(entries={len(self.entries)}, nbytes={self.nbytes}, hits={self.hits}, "
+                f"misses={self.misses}, evictions={self.evictions}, disk_hits={self.disk_hits})")
+
+    # Key for the hull of `points` (a NumPy array) under the given options. SHA-1 is
+    # used as a fast content hash here, not for security; it runs at about 1 GB/s,
+    # well below the cost of any hull of the same points.
+    @staticmethod
+    def key(points, *options):
+        points = np.ascontiguousarray(points)
+        digest = hashlib.sha1(f"{points.dtype.str}{points.shape}{options!r}".encode(), usedforsecurity=False)
+        digest.update(points)
+        return digest.hexdigest()
+
+    # A copy of the cached result for `key` marked as a cache hit, or None (counted as
+    # a miss).
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return _hit(result)
+        if self.directory is not None:
+            path = os.path.join(self.directory, key + '.npy')
+            if os.path.exists(path):
+                result = _load(path)
+                self._insert(key, result)
+                self.hits += 1
+                self.disk_hits += 1
+                return _hit(result)
+        self.misses += 1
+        return None
+
+    # Stores `result` under `key` and evicts what no longer fits.
+    def put(self, key, result):
+        result.vertices.flags.writeable = False
+        if result.indices is not None:
+            result.indices.flags.writeable = False
+        self._insert(key, result)
+        if self.directory is not None:
+            path = os.path.join(self.directory, key + '.npy')
+            if not os.path.exists(path):
+                _save(path, result)
+
+    def _insert(self, key, result):
+        if key in self.entries:
+            self.nbytes -= _size(self.entries.pop(key))
+        self.entries[key] = result
+        self.nbytes += _size(result)
+        while self.entries and (len(self.entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= _size(evicted)
+            self.evictions += 1
+
+    # Empties the memory tier (and with disk=True the disk tier); the counters are kept.
+    def clear(self, disk=False):
+        self.entries.clear()
+        self.nbytes = 0
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.npy'):
+                    os.remove(os.path.join(self.directory, name))
+
+def _hit(result):
+    return HullResult(result.vertices, result.indices, result.method, {'cached': True})
+
+def _size(result):
+    return result.vertices.nbytes + (0 if result.indices is None else result.indices.nbytes)
+
+# A result on disk is a single structured record, so it loads without pickling: the
+# vertices and indices as subarray fields sized for this hull, and the method name.
+# The stats of the run are not kept.
+def _save(path, result):
+    vertices = result.vertices
+    indices = result.indices
+    record = np.zeros((), dtype=[('vertices', vertices.dtype, vertices.shape),
+                                 ('indices', np.intp, (0 if indices is None else len(indices),)),
+                                 ('has_indices', bool),
+                                 ('method', f'U{max(len(result.method), 1)}')])
+    record['vertices'] = vertices
+    record['has_indices'] = indices is not None
+    if indices is not None:
+        record['indices'] = indices
+    record['method'] = result.method
+    # Written under a temporary name and renamed, so a reader never sees half a file.
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        np.save(file, record)
+    os.replace(temporary, path)
+
+def _load(path):
+    record = np.load(path)
+    vertices = record['vertices'].copy()
+    indices = record['indices'].copy() if record['has_indices'] else None
+    vertices.flags.writeable = False
+    if indices is not None:
+        indices.flags.writeable = False
+    return HullResult(vertices, indices, str(record['method']))
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 2000000)
+    cache = HullCache()
+
+    for attempt in ('first', 'repeated'):
+        start_time = time.perf_counter()
+        result = convex_hull(points, cache=cache)
+        end_time = time.perf_counter()
+        print(f"{attempt} call took {end_time - start_time} seconds for {len(points)} points, stats {result.stats}")
+    print(cache)
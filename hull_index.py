@@ -0,0 +1,106 @@
+import numpy as np
+import time
+from monotone_chain import as_points, cross, monotone_chain
+
+# Pseudo-angle of the vectors (dx, dy) with dx >= 0: grows monotonically with the
+# angle from -pi/2 to pi/2 and is cheap to compute for a whole array. The zero vector
+# gets 0.
+def _pseudo_angle(dx, dy):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        angle = dy / (dx + np.abs(dy))
+    return np.nan_to_num(angle, nan=0.0)
+
+# Point-in-hull index. The hull (vertices in the monotone_chain order, so vertex 0 is
+# the lexicographically smallest one and every other vertex lies in the half-plane to
+# its right) is split into a fan of triangles v0, v[k], v[k + 1]. A query is placed in
+# its wedge by np.searchsorted on the pseudo-angles of the fan diagonals, the wedge is
+# confirmed with exact orientation tests (rounding in the angles can only put a query
+# one wedge off, which a fix-up step corrects), and one more orientation test against
+# the hull edge of the wedge answers the query. All queries go through each step
+# together, so a batch of m queries costs O(m log h) in a handful of vector passes.
+#
+# With boundary=True points on the hull boundary count as inside, with
+# boundary=False only points strictly inside do.
+class HullIndex:
+    __slots__ = ('vertices', 'boundary', '_angles')
+
+    # `hull` is a HullResult, an (indices, vertices) pair as returned by the engines,
+    # or an (h, 2) array of hull vertices in counter-clockwise order. Vertices in any
+    # other order or with collinear points are put in shape by a monotone chain pass.
+    def __init__(self, hull, boundary=True):
+        vertices = getattr(hull, 'vertices', None)
+        if vertices is None:
+            vertices = hull[1] if isinstance(hull, tuple) else hull
+        vertices = as_points(vertices).astype(np.float64)
+        self.vertices = vertices[monotone_chain(vertices)[0]]
+        self.boundary = boundary
+        v0 = self.vertices[:1]
+        self._angles = _pseudo_angle(*(self.vertices[1:] - v0).T)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    # Boolean array telling for each of the (m, 2) queries whether it is in the hull.
+    # `boundary` overrides the index default for this call.
+    def contains(self, queries, boundary=None):
+        boundary = self.boundary if boundary is None else boundary
+        queries = as_points(queries).astype(np.float64, copy=False)
+        qx = queries[:, 0]
+        qy = queries[:, 1]
+        v = self.vertices
+        h = len(v)
+        if h == 0:
+            return np.zeros(len(queries), dtype=bool)
+        if h == 1:
+            return (qx == v[0, 0]) & (qy == v[0, 1]) & boundary
+        if h == 2:
+            return _on_segment(v[0], v[1], qx, qy) & boundary
+
+        x0, y0 = v[0]
+        first = cross(x0, y0, v[1, 0], v[1, 1], qx, qy)
+        last = cross(x0, y0, v[-1, 0], v[-1, 1], qx, qy)
+        in_fan = (first >= 0) & (last <= 0)
+
+        # Wedge k (between diagonals v0->v[k] and v0->v[k + 1], 1 <= k <= h - 2): the
+        # last diagonal the query is not clockwise of. Only queries inside the fan are
+        # fixed up; for the others the orientation tests are not monotone in k.
+        k = np.searchsorted(self._angles, _pseudo_angle(qx - x0, qy - y0), side='right')
+        k = np.clip(k, 1, h - 2)
+        while True:
+            back = in_fan & (k > 1) & (cross(x0, y0, v[k, 0], v[k, 1], qx, qy) < 0)
+            ahead = in_fan & (k < h - 2) & (cross(x0, y0, v[k + 1, 0], v[k + 1, 1], qx, qy) >= 0)
+            if not (back.any() or ahead.any()):
+                break
+            k = k - back + ahead
+        edge = cross(v[k, 0], v[k, 1], v[k + 1, 0], v[k + 1, 1], qx, qy)
+
+        inside = (first > 0) & (last < 0) & (edge > 0)
+        if boundary:
+            inside |= in_fan & (edge == 0)
+            inside |= (first == 0) & _on_segment(v[0], v[1], qx, qy)
+            inside |= (last == 0) & _on_segment(v[0], v[-1], qx, qy)
+        return inside
+
+# Whether the points lie on the closed segment a-b.
+def _on_segment(a, b, qx, qy):
+    along = (qx - a[0]) * (b[0] - a[0]) + (qy - a[1]) * (b[1] - a[1])
+    length = (b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2
+    return (cross(a[0], a[1], b[0], b[1], qx, qy) == 0) & (along >= 0) & (along <= length)
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('gaussian', 1000000)
+    queries = generate_points('uniform', 10000000)
+
+    index = HullIndex(monotone_chain(points))
+    start_time = time.perf_counter()
+    inside = index.contains(queries)
+    end_time = time.perf_counter()
+    print(f"{np.count_nonzero(inside)} of {len(queries)} queries inside a {len(index)}-vertex hull")
+
+    print(f"Hull queries took {end_time - start_time} seconds for {len(queries)} points")
@@ -0,0 +1,98 @@
+import time
+from contextlib import contextmanager
+
+# The HullStats the algorithms currently report to, or None. Instrumented functions
+# read it once per call and only count when it is set, so with no collector active
+# the cost is a global lookup per call and a None check per counted event.
+active = None
+
+# Operation counts of one collection run. Counters are created on first use; the
+# names the algorithms use are
+#
+#     orientation_tests        orientation determinants evaluated (vectorized ones
+#                              count one per element)
+#     exact_orientation_tests  of those, the ones the float filter could not decide
+#     stack_pops               points popped in the Graham scan / monotone chain loops
+#     chain_passes             vectorized pruning passes over a chain
+#     recursive_calls          calls of the recursive algorithms (find_hull, divide,
+#                              Kirkpatrick-Seidel), with their deepest nesting in
+#                              max_depth
+#     wrap_steps               hull vertices found by gift wrapping (Jarvis, Chan)
+#
+# and a few algorithm-specific ones (partitions, bridges, expansions and so on).
+class HullStats:
+    __slots__ = ('counts', 'depth', 'max_depth', 'seconds')
+
+    def __init__(self):
+        self.counts = {}
+        self.depth = 0
+        self.max_depth = 0
+        self.seconds = 0.0
+
+    def add(self, name, amount=1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    # Marks entering and leaving one level of a recursive algorithm.
+    def enter(self):
+        self.counts['recursive_calls'] = self.counts.get('recursive_calls', 0) + 1
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def leave(self):
+        self.depth -= 1
+
+    # `function` wrapped so that every call adds one to counter `name`. Loops that call
+    # an orientation function through a local name swap in the wrapper only while
+    # collecting, which leaves the uninstrumented loop untouched.
+    def counted(self, function, name='orientation_tests'):
+        counts = self.counts
+
+        def wrapper(*args):
+            counts[name] = counts.get(name, 0) + 1
+            return function(*args)
+        return wrapper
+
+    # The counters, max_depth and the wall time of the run in seconds, as one flat dict.
+    def as_dict(self):
+        result = dict(self.counts)
+        result['max_depth'] = self.max_depth
+        result['seconds'] = self.seconds
+        return result
+
+    def __repr__(self):
+        return f"HullStats({self.as_dict()})"
+
+# Collects operation counts for the code run inside the with block:
+#
+#     with collect() as stats:
+#         convex_hull(points)
+#     stats.as_dict()
+#
+# Collectors nest; the inner one takes over until its block ends. Counts are per
+# process, so work done in parallel_hull's worker processes is not included.
+@contextmanager
+def collect():
+    global active
+    stats = HullStats()
+    previous = active
+    active = stats
+    start_time = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.seconds = time.perf_counter() - start_time
+        active = previous
+
+if __name__ == '__main__':
+    import numpy as np
+    from convex_hull import convex_hull
+    # Run as a script this module is __main__; the algorithms report to the imported
+    # hull_stats module, so that is the one to collect with.
+    import hull_stats
+
+    points = np.random.uniform(-10, 10, (100000, 2))
+    for method in ('monotone_chain', 'graham', 'quickhull_iterative', 'chan', 'kirkpatrick_seidel'):
+        with hull_stats.collect() as stats:
+            convex_hull(points, method)
+        print(method, stats.as_dict())
@@ -0,0 +1,126 @@
+import numpy as np
+import time
+from bisect import bisect_left
+from monotone_chain import as_points, monotone_chain
+from predicates import orient2d_points
+
+# Online convex hull. The lower and upper chains of graham_scan_trial.graham_scan are
+# kept as lists of (x, y) tuples in lexicographic order, both running from the
+# lexicographically smallest to the largest point. A new point is located in each
+# chain by bisection; if it is on or inside the chain edge it falls under, it is
+# rejected with that single orientation test, otherwise it is spliced in and the
+# neighbours it makes redundant are cut out on either side. Every point is cut out at
+# most once, so insertion is O(log h) amortized apart from the list splice, which is a
+# memmove over the h hull vertices only.
+class IncrementalHull:
+    __slots__ = ('lower', 'upper', 'count', '_hull')
+
+    # Bulk insertions of at least this many points rebuild the chains with one
+    # monotone chain pass over the current vertices and the new points.
+    bulk_threshold = 64
+
+    def __init__(self, points=None):
+        self.lower = []
+        self.upper = []
+        self.count = 0
+        self._hull = None
+        if points is not None:
+            self.extend(points)
+
+    def __len__(self):
+        return len(self.hull)
+
+    # Inserts one point and returns True if the hull changed.
+    def insert(self, point):
+        p = (float(point[0]), float(point[1]))
+        self.count += 1
+        changed = chain_insert(self.lower, p, 1)
+        changed = chain_insert(self.upper, p, -1) or changed
+        if changed:
+            self._hull = None
+        return changed
+
+    # Inserts many points. Small batches go through insert(), large ones are merged
+    # with the current hull by a single monotone chain pass.
+    def extend(self, points):
+        points = as_points(points)
+        if len(points) < self.bulk_threshold:
+            for point in points.tolist():
+                self.insert(point)
+            return
+        self.count += len(points)
+        candidates = np.concatenate((self.hull, points.astype(np.float64, copy=False)))
+        self._set_hull(monotone_chain(candidates)[1])
+
+    # Current hull as an (h, 2) array in the same order as monotone_chain. Built once
+    # per change and cached, so reading it between updates costs nothing.
+    @property
+    def hull(self):
+        if self._hull is None:
+            self._hull = join_chains(self.lower, self.upper)
+        return self._hull
+
+    def _set_hull(self, hull):
+        self.lower, self.upper = split_chains(hull)
+        self._hull = hull
+
+# Lower and upper chains (lists of (x, y) tuples, left to right) of a hull given as an
+# (h, 2) array in monotone_chain order.
+def split_chains(hull):
+    vertices = [tuple(vertex) for vertex in hull.tolist()]
+    if not vertices:
+        return [], []
+    last = vertices.index(max(vertices))
+    return vertices[:last + 1], vertices[:1] + vertices[:last - 1:-1]
+
+# The inverse of split_chains: the (h, 2) hull array in monotone_chain order.
+def join_chains(lower, upper):
+    vertices = lower if len(lower) <= 1 else lower[:-1] + upper[:0:-1]
+    return np.array(vertices, dtype=np.float64).reshape(-1, 2)
+
+# Inserts p into a chain whose hull side is to the left (sign=1, the lower chain) or to
+# the right (sign=-1, the upper chain) of its left-to-right edges. Returns True if p
+# became a vertex.
+def chain_insert(chain, p, sign):
+    return chain_splice(chain, p, sign) is not None
+
+# chain_insert that reports where the chain changed: returns (k, j) if chain[k:j] was
+# replaced by [p], or None if p did not become a vertex.
+def chain_splice(chain, p, sign):
+    i = bisect_left(chain, p)
+    if i < len(chain) and chain[i] == p:
+        return None
+    if 0 < i < len(chain) and sign * orient(chain[i - 1], chain[i], p) >= 0:
+        return None
+
+    # Vertices that no longer make a strict turn with p are cut out on both sides.
+    j = i
+    while j + 1 < len(chain) and sign * orient(p, chain[j], chain[j + 1]) <= 0:
+        j += 1
+    k = i
+    while k >= 2 and sign * orient(chain[k - 2], chain[k - 1], p) <= 0:
+        k -= 1
+    chain[k:j] = [p]
+    return k, j
+
+# Cross product of o->a and o->b for (x, y) tuples; positive for a left turn. The sign
+# is exact, see predicates.orient2d.
+orient = orient2d_points
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('gaussian', 1000000)
+
+    incremental = IncrementalHull()
+    start_time = time.perf_counter()
+    for point in points.tolist():
+        incremental.insert(point)
+    end_time = time.perf_counter()
+    print(incremental.hull)
+
+    print(f"{len(points)} single insertions took {end_time - start_time} seconds")
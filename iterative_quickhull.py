@@ -0,0 +1,145 @@
+import numpy as np
+import time
+import hull_stats
+from monotone_chain import as_points, cross, monotone_chain
+from predicates import kernel_coordinates, orient2d, static_bound
+
+# Same walk in plain Python for a handful of points, where NumPy call overhead would
+# dominate. Takes the points strictly right of a->b as (index, x, y) tuples and
+# returns the indices of the hull vertices from a (included) up to b (excluded).
+# Side tests are decided by the float determinant when it is above `bound` (the
+# predicates.static_bound of the input) and by orient2d otherwise.
+def _small_cap(a, b, candidates, bound):
+    stack = [(a, b, candidates)]
+    cap = []
+    stats = hull_stats.active
+    while stack:
+        a, b, candidates = stack.pop()
+        if not candidates:
+            cap.append(a[0])
+            continue
+        if stats is not None:
+            # One distance and two side tests per candidate
+            stats.add('orientation_tests', 3 * len(candidates))
+        _, ax, ay = a
+        _, bx, by = b
+        c, c_distance, c_along = None, 0.0, 0.0
+        for point in candidates:
+            _, x, y = point
+            distance = (by - ay) * (x - ax) - (bx - ax) * (y - ay)
+            along = (x - ax) * (bx - ax) + (y - ay) * (by - ay)
+            if c is None or distance > c_distance or (distance == c_distance and along > c_along):
+                c, c_distance, c_along = point, distance, along
+        _, cx, cy = c
+        first_part = [p for p in candidates
+                      if (side := (cx - ax) * (p[2] - ay) - (cy - ay) * (p[1] - ax)) < -bound
+                      or (side <= bound and p is not c and orient2d(ax, ay, cx, cy, p[1], p[2]) < 0)]
+        second_part = [p for p in candidates
+                       if (side := (bx - cx) * (p[2] - cy) - (by - cy) * (p[1] - cx)) < -bound
+                       or (side <= bound and p is not c and orient2d(cx, cy, bx, by, p[1], p[2]) < 0)]
+        stack.append((c, b, second_part))
+        stack.append((a, c, first_part))
+    return cap
+
+# QuickHull without recursion. Pending hull edges live on an explicit stack as
+# (a, b, lo, hi): the points strictly right of a->b occupy work[lo:hi]. The farthest
+# of them is found with an argmax of the unnormalized cross product (no square roots),
+# and the range is partitioned in place with boolean masks into the points right of
+# a->c followed by those right of c->b. Returns the hull indices and coordinates in
+# counter-clockwise order from the lexicographically smallest point, like
+# monotone_chain.
+def quickhull_iterative(points):
+    points = as_points(points)
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp), points[:0]
+    xs, ys, span = kernel_coordinates(points[:, 0], points[:, 1])
+
+    leftmost = np.flatnonzero(xs == xs.min())
+    rightmost = np.flatnonzero(xs == xs.max())
+    first = leftmost[np.argmin(ys[leftmost])]
+    last = rightmost[np.argmax(ys[rightmost])]
+    if first == last or (xs[first] == xs[last] and ys[first] == ys[last]):
+        indices = np.array([first], dtype=np.intp)
+        return indices, points[indices]
+
+    # Points below the line first->last form the lower range, points above it the
+    # upper one; the coordinates are permuted along with the indices.
+    bound = static_bound(span)
+    side = cross(xs[first], ys[first], xs[last], ys[last], xs, ys, span)
+    below = np.flatnonzero(side < 0)
+    above = np.flatnonzero(side > 0)
+    work = np.concatenate((below, above))
+    wx = xs[work]
+    wy = ys[work]
+
+    stack = [(last, first, len(below), len(work)), (first, last, 0, len(below))]
+    hull = []
+    stats = hull_stats.active
+    while stack:
+        a, b, lo, hi = stack.pop()
+        if stats is not None:
+            stats.add('partitions')
+        if hi - lo <= 32:
+            candidates = list(zip(work[lo:hi].tolist(), wx[lo:hi].tolist(), wy[lo:hi].tolist()))
+            hull.extend(_small_cap((a, xs[a], ys[a]), (b, xs[b], ys[b]), candidates, bound))
+            continue
+        ax, ay, bx, by = xs[a], ys[a], xs[b], ys[b]
+        sx = wx[lo:hi]
+        sy = wy[lo:hi]
+
+        # Distance to the right of a->b, up to the constant factor |ab|. Among equally
+        # far points the one farthest towards b is taken, so that points on the far
+        # side of the triangle are never reported as vertices. The plain determinant
+        # is off by at most `bound`, which only matters when the largest distance is
+        # of that order too (nearly collinear points); only then are the distances
+        # taken from cross, whose small values are exact.
+        distance = np.subtract(sx, ax)
+        distance *= by - ay
+        rise = np.subtract(sy, ay)
+        rise *= bx - ax
+        distance -= rise
+        farthest = np.argmax(distance)
+        if distance[farthest] <= 4 * bound:
+            distance = -cross(ax, ay, bx, by, sx, sy, span)
+            farthest = np.argmax(distance)
+        ties = np.flatnonzero(distance == distance[farthest])
+        if len(ties) > 1:
+            along = (sx[ties] - ax) * (bx - ax) + (sy[ties] - ay) * (by - ay)
+            farthest = ties[np.argmax(along)]
+        c = work[lo + farthest]
+        cx, cy = xs[c], ys[c]
+
+        first_part = cross(ax, ay, cx, cy, sx, sy, span) < 0
+        second_part = cross(cx, cy, bx, by, sx, sy, span) < 0
+        middle = lo + np.count_nonzero(first_part)
+        end = middle + np.count_nonzero(second_part)
+        for column, values in ((work, work[lo:hi]), (wx, sx), (wy, sy)):
+            left, right = values[first_part], values[second_part]
+            column[lo:middle] = left
+            column[middle:end] = right
+
+        stack.append((c, b, middle, end))
+        stack.append((a, c, lo, middle))
+
+    # The side tests are exact, so every hull vertex is in `hull`, but with nearly
+    # collinear points the rounded distances can pick a point that is not a vertex as
+    # the farthest one. A monotone chain pass over the few collected points drops it.
+    hull = np.array(hull, dtype=np.intp)
+    indices = hull[monotone_chain(points[hull])[0]]
+    return indices, points[indices]
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 10000000)
+
+    start_time = time.perf_counter()
+    indices, hull = quickhull_iterative(points)
+    end_time = time.perf_counter()
+    print(hull)
+
+    print(f"Iterative QuickHull took {end_time - start_time} seconds for {len(points)} points")
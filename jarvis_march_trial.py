@@ -1,5 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import hull_stats
+from predicates import kernel_coordinates, static_filter
 
 def generate_points(distribution, n):
     if distribution == 'gaussian':
@@ -8,31 +10,66 @@ def generate_points(distribution, n):
         return np.random.uniform(-10, 10, (n, 2))
 
 def jarvis_march(points):
+    points = np.asarray(points)
     if len(points) < 3:
         return points  # Convex Hull cannot exist if fewer than 3 points
 
-    # Find the leftmost point to start the hull
-    start = min(points, key=lambda p: p[0])
+    # Integer coordinates are kept exact (see predicates.kernel_coordinates)
+    xs, ys, span = kernel_coordinates(points[:, 0], points[:, 1])
+
+    # Start from the leftmost point (the lowest one on ties), which is always on the hull
+    leftmost = np.flatnonzero(xs == xs.min())
+    start = leftmost[np.argmin(ys[leftmost])]
     hull = [start]
     current = start
 
-    while True:
-        next_point = points[0]
-        for candidate in points:
-            if np.array_equal(candidate, current):
-                continue
-            # Cross product calculation
-            cross_product = (next_point[0] - current[0]) * (candidate[1] - current[1]) - (next_point[1] - current[1]) * (candidate[0] - current[0])
-            if cross_product < 0 or (cross_product == 0 and np.linalg.norm(candidate - current) > np.linalg.norm(next_point - current)):
-                next_point = candidate
-        
-        if np.array_equal(next_point, start):
+    # Direction of the previous hull edge; nothing lies below the start point, so
+    # the first step measures turns from straight down
+    edge_x, edge_y = 0.0, -1.0
+
+    # A hull never has more vertices than points, so the wrap cannot spin forever
+    for _ in range(len(points)):
+        vx = xs - xs[current]
+        vy = ys - ys[current]
+
+        # Turn from the previous edge to every candidate in one vectorized expression;
+        # the current point (and any copy of it) can never be the next one. The angle
+        # is only an estimate, so integer offsets may be rounded to float for it
+        turn = np.arctan2(np.asarray(edge_x * vy - edge_y * vx, dtype=np.float64),
+                          np.asarray(edge_x * vx + edge_y * vy, dtype=np.float64))
+        turn[(vx == 0) & (vy == 0)] = np.inf
+        next_point = np.argmin(turn)
+
+        # Confirm with cross products whose signs are exact (see predicates): nothing
+        # may lie clockwise of the chosen edge, and among candidates collinear with it
+        # the farthest one wins. Exact signs make "clockwise of" a strict order, so
+        # this cannot cycle
+        cross_product = exact_cross(xs, ys, current, next_point, vx, vy, span)
+        while cross_product.min() < 0:
+            next_point = np.argmin(cross_product)
+            cross_product = exact_cross(xs, ys, current, next_point, vx, vy, span)
+        ahead = (cross_product == 0) & (vx[next_point] * vx + vy[next_point] * vy > 0)
+        next_point = np.argmax(np.where(ahead, vx * vx + vy * vy, -1))
+
+        if next_point == start or (xs[next_point] == xs[start] and ys[next_point] == ys[start]):
             break
 
+        if hull_stats.active is not None:
+            hull_stats.active.add('wrap_steps')
         hull.append(next_point)
+        edge_x, edge_y = vx[next_point], vy[next_point]
         current = next_point
 
-    return np.array(hull)
+    return points[hull]
+
+# Cross products of current->next_point with current->every point, from the offsets
+# vx, vy of every point from the current one
+def exact_cross(xs, ys, current, next_point, vx, vy, span):
+    cross_product = vx[next_point] * vy - vy[next_point] * vx
+    if hull_stats.active is not None:
+        hull_stats.active.add('orientation_tests', len(cross_product))
+    return static_filter(cross_product, span, xs[current], ys[current],
+                         xs[next_point], ys[next_point], xs, ys)
 
 def visualize(points, hull):
     plt.figure(figsize=(10, 6))
@@ -42,8 +79,9 @@ def visualize(points, hull):
     plt.plot(hull[:, 0], hull[:, 1], 'ro')
     plt.show()
 
-# Generate points and compute the Convex Hull using the Jarvis March algorithm
-points = generate_points('uniform', 100)
-hull = jarvis_march(points)
-print(hull)
-"""visualize(points, hull)"""
+if __name__ == '__main__':
+    # Generate points and compute the Convex Hull using the Jarvis March algorithm
+    points = generate_points('uniform', 100)
+    hull = jarvis_march(points)
+    print(hull)
+    """visualize(points, hull)"""
@@ -0,0 +1,170 @@
+import numpy as np
+import time
+import hull_stats
+from monotone_chain import as_points, cross, prune_chain, sort_points
+from predicates import kernel_coordinates
+
+# Upper chain of the candidates from left to right, by a plain monotone chain pass.
+# `span` bounds every coordinate difference of the input (see
+# predicates.coordinate_span) and selects the static filter of the orientation tests
+# here and below.
+def _upper_chain(xs, ys, candidates, span):
+    ordered = candidates[sort_points(xs[candidates], ys[candidates])][::-1]
+    distinct = np.ones(len(ordered), dtype=bool)
+    distinct[1:] = (xs[ordered[1:]] != xs[ordered[:-1]]) | (ys[ordered[1:]] != ys[ordered[:-1]])
+    ordered = ordered[distinct]
+    return ordered[prune_chain(xs[ordered], ys[ordered], span)][::-1]
+
+# Bridge read off the upper chain of the candidates: the chain edge that straddles
+# x = a. Used for the last few candidates, and whenever rounding stalls the pruning.
+def _chain_bridge(xs, ys, candidates, a, span):
+    chain = _upper_chain(xs, ys, candidates, span)
+    edge = np.flatnonzero((xs[chain[:-1]] <= a) & (xs[chain[1:]] > a))[0]
+    return chain[edge], chain[edge + 1]
+
+# Upper bridge across the vertical line x = a by prune and search. Candidates are
+# paired up, the median pair slope K is found with np.partition, and the points
+# maximising y - K*x tell on which side of the line the bridge lies; every pair on the
+# wrong side of K loses a point that cannot be a bridge endpoint. Each round is a few
+# vector operations and drops at least a quarter of the candidates. The slopes are
+# rounded, so the bridge found this way is confirmed with exact orientation tests
+# (see _confirmed) before it is returned.
+def bridge(xs, ys, candidates, a, span):
+    if hull_stats.active is not None:
+        hull_stats.active.add('bridges')
+    everything = candidates
+    # Coordinates of all the candidates, gathered once for the first round and reused
+    # to confirm the bridge.
+    ex = ey = None
+    while len(candidates) > 4:
+        cx = xs[candidates]
+        cy = ys[candidates]
+        if ex is None:
+            ex, ey = cx, cy
+        p = np.arange(0, len(candidates) - 1, 2)
+        q = p + 1
+        swap = cx[p] > cx[q]
+        p, q = np.where(swap, q, p), np.where(swap, p, q)
+        drop = np.zeros(len(candidates), dtype=bool)
+
+        # Of two points on a vertical line only the upper one can be on the upper hull.
+        vertical = cx[p] == cx[q]
+        drop[np.where(cy[p] > cy[q], q, p)[vertical]] = True
+        p, q = p[~vertical], q[~vertical]
+        if len(p):
+            slopes = (cy[q] - cy[p]) / (cx[q] - cx[p])
+            k = np.partition(slopes, len(slopes) // 2)[len(slopes) // 2]
+            heights = cy - k * cx
+            touching = heights == heights.max()
+            i = np.flatnonzero(touching)[np.argmin(cx[touching])]
+            j = np.flatnonzero(touching)[np.argmax(cx[touching])]
+            if cx[i] <= a < cx[j]:
+                return _confirmed(xs, ys, everything, ex, ey, candidates[i], candidates[j], a, span)
+            if cx[j] <= a:
+                # The bridge is to the right: the left point of a pair whose slope is
+                # at least K lies below the bridge.
+                drop[p[slopes >= k]] = True
+            else:
+                # The bridge is to the left: the right point of a pair whose slope is
+                # at most K lies below the bridge.
+                drop[q[slopes <= k]] = True
+            drop &= ~touching
+        if not drop.any():
+            break
+        candidates = candidates[~drop]
+    if ex is None:
+        ex, ey = xs[everything], ys[everything]
+    return _confirmed(xs, ys, everything, ex, ey, *_chain_bridge(xs, ys, candidates, a, span), a, span)
+
+# The bridge i-j if no candidate lies strictly above its line, widened to the outermost
+# candidates on that line; otherwise the bridge read off the upper chain of all the
+# candidates. cx and cy are the coordinates of the candidates.
+def _confirmed(xs, ys, candidates, cx, cy, i, j, a, span):
+    side = cross(xs[i], ys[i], xs[j], ys[j], cx, cy, span)
+    if np.any(side > 0):
+        return _chain_bridge(xs, ys, candidates, a, span)
+    on_line = np.flatnonzero(side == 0)
+    return candidates[on_line[np.argmin(cx[on_line])]], candidates[on_line[np.argmax(cx[on_line])]]
+
+# Upper hull vertices from k to m (both included, x_k < x_m) among the candidates.
+# The bridge over the median x is found first and everything under it is discarded
+# before recursing on both sides ("marriage before conquest"). Small subproblems are
+# finished with a plain chain pass, which is cheaper than another round of bridges.
+def _connect(xs, ys, k, m, candidates, span):
+    stats = hull_stats.active
+    if stats is not None:
+        stats.enter()
+    if len(candidates) <= 64:
+        if stats is not None:
+            stats.leave()
+        return _upper_chain(xs, ys, candidates, span).tolist()
+    cx = xs[candidates]
+    a = np.partition(cx, len(cx) // 2)[len(cx) // 2]
+    if a >= xs[m]:
+        a = cx[cx < xs[m]].max()
+    i, j = bridge(xs, ys, candidates, a, span)
+
+    if i == k:
+        hull = [k]
+    else:
+        left = candidates[(cx > xs[k]) & (cx < xs[i])]
+        left = left[cross(xs[k], ys[k], xs[i], ys[i], xs[left], ys[left], span) > 0]
+        hull = _connect(xs, ys, k, i, np.concatenate(([k], left, [i])), span)
+    if j == m:
+        hull.append(m)
+    else:
+        right = candidates[(cx > xs[j]) & (cx < xs[m])]
+        right = right[cross(xs[j], ys[j], xs[m], ys[m], xs[right], ys[right], span) > 0]
+        hull.extend(_connect(xs, ys, j, m, np.concatenate(([j], right, [m])), span))
+    if stats is not None:
+        stats.leave()
+    return hull
+
+# Upper hull from the leftmost to the rightmost point (the topmost one where several
+# share the extreme x), as a list of indices in increasing x.
+def upper_hull(xs, ys, span):
+    leftmost = np.flatnonzero(xs == xs.min())
+    rightmost = np.flatnonzero(xs == xs.max())
+    k = leftmost[np.argmax(ys[leftmost])]
+    m = rightmost[np.argmax(ys[rightmost])]
+    if xs[k] == xs[m]:
+        return [k]
+    inside = np.flatnonzero((xs > xs[k]) & (xs < xs[m]))
+    inside = inside[cross(xs[k], ys[k], xs[m], ys[m], xs[inside], ys[inside], span) > 0]
+    return _connect(xs, ys, k, m, np.concatenate(([k], inside, [m])), span)
+
+# Kirkpatrick-Seidel O(n log h) hull. The lower hull is the upper hull of the points
+# mirrored in the x axis. Returns the hull indices and coordinates in the same order
+# as monotone_chain.
+def kirkpatrick_seidel(points):
+    points = as_points(points)
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp), points[:0]
+    xs, ys, span = kernel_coordinates(points[:, 0], points[:, 1])
+
+    lower = upper_hull(xs, -ys, span)
+    upper = upper_hull(xs, ys, span)[::-1]
+    # The chains meet at the extreme x values; drop shared endpoints so each vertex
+    # is reported once.
+    if xs[lower[-1]] == xs[upper[0]] and ys[lower[-1]] == ys[upper[0]]:
+        upper = upper[1:]
+    if upper and xs[lower[0]] == xs[upper[-1]] and ys[lower[0]] == ys[upper[-1]]:
+        upper = upper[:-1]
+    indices = np.array(lower + upper, dtype=np.intp)
+    return indices, points[indices]
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 1000000)
+
+    start_time = time.perf_counter()
+    indices, hull = kirkpatrick_seidel(points)
+    end_time = time.perf_counter()
+    print(hull)
+
+    print(f"Kirkpatrick-Seidel took {end_time - start_time} seconds for {len(points)} points")
@@ -2,6 +2,8 @@ import pygame
 import sys
 import numpy as np
 import graham_scan
+import hull_stats
+from predicates import orient2d_points
 # numpy-1.26.4 pygame-2.5.2
 
 
@@ -16,11 +18,12 @@ def generate_gaussian_points(min, max, count):
 # 0 : Collinear points
 # 1 : Clockwise points
 # 2 : Counterclockwise points
+# The result is exact, see predicates.orient2d.
 def orientation(p, q, r):
-    val = (q[1] - p[1]) * (r[0] - q[0]) - (q[0] - p[0]) * (r[1] - q[1])
+    val = orient2d_points(p, q, r)
     if val == 0:
         return 0  # Collinear
-    return 1 if val > 0 else 2  # Clockwise or Counterclockwise
+    return 1 if val < 0 else 2  # Clockwise or Counterclockwise
 
 # Function to perform Graham's scan algorithm to find convex hull
 def convex_hull_graham_scan(points):
@@ -53,16 +56,26 @@ def convex_hull_graham_scan(points):
     stack.append(points[1])
     stack.append(points[2])
     
+    # Count the turns and pops when collecting stats (see hull_stats)
+    turn = orientation
+    stats = hull_stats.active
+    if stats is not None:
+        turn = stats.counted(orientation)
+
     # Iterate over the remaining points
     for i in range(3, n):
         # Pop points from the stack while the angle formed by points at the top of the stack,
         # the point just below it, and the current point makes a non-left turn
-        while len(stack) > 1 and orientation(stack[-2], stack[-1], points[i]) != 2:
+        while len(stack) > 1 and turn(stack[-2], stack[-1], points[i]) != 2:
             stack.pop()
         
         # Push the current point onto the stack
         stack.append(points[i])
     
+    # Every point was pushed once, so the ones not on the stack were popped
+    if stats is not None:
+        stats.add('stack_pops', n - len(stack))
+
     # The stack now contains the convex hull in counterclockwise order
     return stack
 
@@ -1,60 +1,71 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from functools import cmp_to_key
+import hull_stats
+from predicates import orient2d
 
-# Stores the center of polygon (It is made global because it is used in the compare function)
-mid = [0, 0]
-
-# Determines the quadrant of the point (used in compare())
-def quad(p):
-    if p[0] >= 0 and p[1] >= 0:
-        return 1
-    if p[0] <= 0 and p[1] >= 0:
-        return 2
-    if p[0] <= 0 and p[1] <= 0:
-        return 3
-    return 4
-
-# Checks whether the line is crossing the polygon
+# Checks whether the line is crossing the polygon (1 for a clockwise turn a, b, c,
+# -1 for a counter-clockwise one); the sign is exact, see predicates.orient2d. Only
+# the first two entries of each point are read: parallel_hull passes [x, y, position]
+# rows.
 def orientation(a, b, c):
-    res = (b[1]-a[1]) * (c[0]-b[0]) - (c[1]-b[1]) * (b[0]-a[0])
+    if hull_stats.active is not None:
+        hull_stats.active.add('orientation_tests')
+    res = -orient2d(a[0], a[1], b[0], b[1], c[0], c[1])
     if res == 0:
         return 0
     if res > 0:
         return 1
     return -1
 
-# Compare function for sorting
-def compare(p1, q1):
-    p = [p1[0]-mid[0], p1[1]-mid[1]]
-    q = [q1[0]-mid[0], q1[1]-mid[1]]
-    one = quad(p)
-    two = quad(q)
-    if one != two:
-        if one < two:
-            return -1
-        return 1
-    if p[1]*q[0] < q[1]*p[0]:
-        return -1
-    return 1
+# Whether q lies farther from pivot than p, for three distinct collinear points with
+# p and q on the same side of pivot. Compares coordinates directly, so it is exact.
+def farther(p, q, pivot):
+    if p[0] != q[0]:
+        return (q[0] < p[0]) == (p[0] < pivot[0])
+    return (q[1] < p[1]) == (p[1] < pivot[1])
 
-# Finds upper tangent of two polygons 'a' and 'b' represented as two vectors
+# Whether the tangent walk from p to q (seen from pivot on the other hull) makes
+# progress: q turns the line by `turn`, or q lies on the line beyond p. Collinear
+# neighbours nearer to the pivot never move the walk, so it cannot go round in
+# circles on grids or on hulls that are a single segment.
+def advances(pivot, p, q, turn):
+    side = orientation(pivot, p, q)
+    if side == 0:
+        return p is not q and farther(p, q, pivot)
+    return side == turn
+
+# Drops the vertices of a convex polygon that are collinear with their neighbours.
+# A polygon whose points all lie on one line comes back as its two end points.
+def strict(polygon):
+    n = len(polygon)
+    if n < 3:
+        return polygon
+    kept = [polygon[i] for i in range(n)
+            if orientation(polygon[i-1], polygon[i], polygon[(i+1) % n]) != 0]
+    if not kept:
+        kept = [min(polygon), max(polygon)]
+    return kept
+
+# Finds upper tangent of two polygons 'a' and 'b' represented as two vectors. 'a'
+# must lie lexicographically before 'b' (sorted by x, then y) and both must be in
+# counter-clockwise order without collinear vertices; a single point or a segment
+# is also accepted.
 def merger(a, b):
     n1, n2 = len(a), len(b)
     ia, ib = 0, 0
     for i in range(1, n1):
-        if a[i][0] > a[ia][0]:
+        if a[i][:2] > a[ia][:2]:
             ia = i
     for i in range(1, n2):
-        if b[i][0] < b[ib][0]:
+        if b[i][:2] < b[ib][:2]:
             ib = i
     inda, indb = ia, ib
     done = 0
     while not done:
         done = 1
-        while orientation(b[indb], a[inda], a[(inda+1) % n1]) >= 0:
+        while advances(b[indb], a[inda], a[(inda+1) % n1], 1):
             inda = (inda + 1) % n1
-        while orientation(a[inda], b[indb], b[(n2+indb-1) % n2]) <= 0:
+        while advances(a[inda], b[indb], b[(n2+indb-1) % n2], -1):
             indb = (indb - 1) % n2
             done = 0
     uppera, upperb = inda, indb
@@ -62,9 +73,9 @@ def merger(a, b):
     done = 0
     while not done:
         done = 1
-        while orientation(a[inda], b[indb], b[(indb+1) % n2]) >= 0:
+        while advances(a[inda], b[indb], b[(indb+1) % n2], 1):
             indb = (indb + 1) % n2
-        while orientation(b[indb], a[inda], a[(n1+inda-1) % n1]) <= 0:
+        while advances(b[indb], a[inda], a[(n1+inda-1) % n1], -1):
             inda = (inda - 1) % n1
             done = 0
     ret = []
@@ -79,54 +90,55 @@ def merger(a, b):
     while ind != upperb:
         ind = (ind+1) % n2
         ret.append(b[ind])
-    return ret
+    return strict(ret)
 
-# Brute force algorithm to find convex hull for a set of less than 6 points
+# Finds the convex hull of up to five distinct sorted points with one lower and one
+# upper chain pass. Points that do not make a strict counter-clockwise turn are
+# popped, so collinear points are dropped and the result is counter-clockwise
+# from the leftmost point.
 def bruteHull(a):
-    global mid
-    s = set()
-    for i in range(len(a)):
-        for j in range(i+1, len(a)):
-            x1, x2 = a[i][0], a[j][0]
-            y1, y2 = a[i][1], a[j][1]
-            a1, b1, c1 = y1-y2, x2-x1, x1*y2-y1*x2
-            pos, neg = 0, 0
-            for k in range(len(a)):
-                if (k == i) or (k == j) or (a1*a[k][0]+b1*a[k][1]+c1 <= 0):
-                    neg += 1
-                if (k == i) or (k == j) or (a1*a[k][0]+b1*a[k][1]+c1 >= 0):
-                    pos += 1
-            if pos == len(a) or neg == len(a):
-                s.add(tuple(a[i]))
-                s.add(tuple(a[j]))
-    ret = []
-    for x in s:
-        ret.append(list(x))
-    mid = [0, 0]
-    n = len(ret)
-    for i in range(n):
-        mid[0] += ret[i][0]
-        mid[1] += ret[i][1]
-        ret[i][0] *= n
-        ret[i][1] *= n
-    ret = sorted(ret, key=cmp_to_key(compare))
-    for i in range(n):
-        ret[i] = [ret[i][0]/n, ret[i][1]/n]
-    return ret
+    if len(a) < 3:
+        return a
+    lower, upper = [], []
+    for p in a:
+        while len(lower) >= 2 and orientation(lower[-2], lower[-1], p) != -1:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(a):
+        while len(upper) >= 2 and orientation(upper[-2], upper[-1], p) != -1:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
 
-# Returns the convex hull for the given set of points
+# Returns the convex hull for the given set of sorted points. Copies of one point
+# are never split between the two halves, and bruteHull drops them at the leaves.
 def divide(a):
+    stats = hull_stats.active
+    if stats is not None:
+        stats.enter()
     if len(a) <= 5:
-        return bruteHull(a)
-    left, right = [], []
-    start = int(len(a)/2)
-    for i in range(start):
-        left.append(a[i])
-    for i in range(start, len(a)):
-        right.append(a[i])
-    left_hull = divide(left)
-    right_hull = divide(right)
-    return merger(left_hull, right_hull)
+        unique = []
+        for p in a:
+            if not unique or p != unique[-1]:
+                unique.append(p)
+        hull = bruteHull(unique)
+    else:
+        start = int(len(a)/2)
+        while start < len(a) and a[start] == a[start-1]:
+            start += 1
+        if start == len(a):
+            start = int(len(a)/2)
+            while start > 0 and a[start] == a[start-1]:
+                start -= 1
+        if start == 0:
+            hull = [a[0]]
+        else:
+            left_hull = divide(a[:start])
+            right_hull = divide(a[start:])
+            hull = merger(left_hull, right_hull)
+    if stats is not None:
+        stats.leave()
+    return hull
 
 # Visualization function
 def visualize(points, hull):
@@ -0,0 +1,82 @@
+import numpy as np
+import time
+from functools import reduce
+from monotone_chain import as_points, monotone_chain, sorted_hull
+
+# Splits a convex polygon into two runs of vertices in lexicographic order. The
+# polygon is rotated to start at its lexicographically smallest vertex and turned
+# counter-clockwise if it is not; then the vertices up to the largest one (the lower
+# chain) increase, and the rest (the upper chain) increase when read backwards.
+def chain_runs(polygon):
+    xs = polygon[:, 0]
+    ys = polygon[:, 1]
+    leftmost = np.flatnonzero(xs == xs.min())
+    first = leftmost[np.argmin(ys[leftmost])]
+    polygon = np.roll(polygon, -first, axis=0)
+    x, y = polygon[:, 0], polygon[:, 1]
+    if np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)) < 0:
+        polygon = np.concatenate((polygon[:1], polygon[:0:-1]))
+        x, y = polygon[:, 0], polygon[:, 1]
+    rightmost = np.flatnonzero(x == x.max())
+    last = rightmost[np.argmax(y[rightmost])]
+    return polygon[:last + 1], polygon[:last:-1]
+
+# Lexicographic order of points made of sorted runs laid end to end. A stable sort is
+# a merge sort that finds the runs (timsort), so this costs a merge of the runs rather
+# than a full sort; complex keys compare by real part first, which makes the one sort
+# lexicographic. Integers beyond 2 ** 53 are not exact as complex keys and are sorted
+# with np.lexsort instead.
+def merge_order(points):
+    if points.dtype.kind in 'iu' and len(points) and np.abs(points).max() > 2 ** 53:
+        return np.lexsort((points[:, 1], points[:, 0]))
+    keys = np.empty(len(points), dtype=np.complex128)
+    keys.real = points[:, 0]
+    keys.imag = points[:, 1]
+    return np.argsort(keys, kind='stable')
+
+# Convex hull of the union of convex polygons, each an (h, 2) array of its vertices in
+# order around it, like the hulls every engine here returns (or a HullResult). The
+# vertices of every polygon are already two sorted runs (see chain_runs), so the
+# points are merged into lexicographic order rather than sorted, and one monotone
+# chain pass finishes the hull; the raw points behind the polygons are never needed.
+# The result is in the common order: counter-clockwise from the lexicographically
+# smallest vertex, without collinear or repeated vertices. It depends only on the
+# union of the inputs, so merge_hulls is associative and commutative, with an empty
+# polygon as identity, and serves as the combining step of a tree or functools.reduce
+# over hulls of arbitrary (even overlapping) shards.
+def merge_hulls(*hulls):
+    runs = []
+    for hull in hulls:
+        polygon = as_points(getattr(hull, 'vertices', hull))
+        if len(polygon):
+            runs.extend(chain_runs(polygon))
+    if not runs:
+        return np.empty((0, 2))
+    points = np.concatenate(runs)
+    return sorted_hull(points, merge_order(points))[1]
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('gaussian', 10000000)
+    shards = np.array_split(points, 64)
+
+    start_time = time.perf_counter()
+    hulls = [monotone_chain(shard)[1] for shard in shards]
+    end_time = time.perf_counter()
+    print(f"Shard hulls took {end_time - start_time} seconds for {len(points)} points")
+
+    start_time = time.perf_counter()
+    hull = reduce(merge_hulls, hulls)
+    end_time = time.perf_counter()
+    print(hull)
+    print(f"Merging {len(hulls)} hulls pairwise took {end_time - start_time} seconds")
+
+    start_time = time.perf_counter()
+    merge_hulls(*hulls)
+    end_time = time.perf_counter()
+    print(f"Merging {len(hulls)} hulls at once took {end_time - start_time} seconds")
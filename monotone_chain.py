@@ -0,0 +1,152 @@
+import numpy as np
+import time
+import hull_stats
+from predicates import kernel_coordinates, orient2d, orient2d_batch, static_bound
+
+# Returns the input as a contiguous (n, 2) array. float32, float64, int64 and uint64
+# inputs are used as they are (no copy when already contiguous), other integer types
+# become int64 and anything else float64. Integer coordinates stay integers so that
+# the engines can run their orientation tests in exact integer arithmetic, see
+# predicates.kernel_coordinates.
+def as_points(points):
+    points = np.asarray(points)
+    if points.dtype.kind in 'iu':
+        if points.dtype != np.int64 and points.dtype != np.uint64:
+            points = points.astype(np.int64)
+    elif points.dtype != np.float64 and points.dtype != np.float32:
+        points = points.astype(np.float64)
+    points = np.ascontiguousarray(points)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must be an (n, 2) array")
+    return points
+
+# 2D cross product of OA and OB, elementwise over coordinate arrays. Positive for a
+# counter-clockwise turn, negative for clockwise and zero if the points are collinear.
+# The sign is exact, see predicates.orient2d_batch (which also explains `span`).
+def cross(ox, oy, ax, ay, bx, by, span=None):
+    return orient2d_batch(ox, oy, ax, ay, bx, by, span)
+
+# Lexicographic (x, then y) order of the points. A plain argsort on x is several times
+# faster than np.lexsort and already lexicographic when no two x values are equal.
+def sort_points(xs, ys):
+    order = np.argsort(xs)
+    sorted_xs = xs[order]
+    if np.any(sorted_xs[1:] == sorted_xs[:-1]):
+        order = np.lexsort((ys, xs))
+    return order
+
+# Classic stack pass of the monotone chain over chain coordinates whose first and last
+# entries are the endpoints. The stack is a preallocated buffer of positions. Turns
+# above the static error bound for `span` are taken from the float cross product.
+def _stack_chain(cx, cy, span=None):
+    px = cx.tolist()
+    py = cy.tolist()
+    bound = static_bound(span) if span is not None else np.inf
+    stats = hull_stats.active
+    stack = [0] * len(px)
+    top = 0
+    for i in range(len(px)):
+        while top >= 2:
+            if stats is not None:
+                stats.add('orientation_tests')
+            o, a = stack[top - 2], stack[top - 1]
+            turn = (px[a] - px[o]) * (py[i] - py[o]) - (py[a] - py[o]) * (px[i] - px[o])
+            if turn > bound or (turn >= -bound and orient2d(px[o], py[o], px[a], py[a], px[i], py[i]) > 0):
+                break
+            top -= 1
+        stack[top] = i
+        top += 1
+    if stats is not None:
+        # Every point was pushed once, so the ones not on the stack were popped.
+        stats.add('stack_pops', len(px) - top)
+    return np.array(stack[:top], dtype=np.intp)
+
+# Reduces a sorted chain of distinct points (endpoints included) to its convex part and
+# returns the positions of the surviving entries. Every vectorized pass drops all
+# interior entries that do not make a strict left turn with their neighbours; such
+# points are never hull vertices, so dropping them together is safe. Once passes stop
+# removing a sizeable share the survivors go through the stack pass; a single slow
+# pass is tolerated since nearly convex chains finish on the next one. `span`, if
+# known, bounds the coordinate differences and enables the cheaper static filter of
+# the orientation tests.
+def prune_chain(cx, cy, span=None):
+    positions = np.arange(len(cx))
+    slow_passes = 0
+    stats = hull_stats.active
+    while len(positions) > 2:
+        if stats is not None:
+            stats.add('chain_passes')
+        turns = cross(cx[:-2], cy[:-2], cx[1:-1], cy[1:-1], cx[2:], cy[2:], span) > 0
+        removed = len(turns) - np.count_nonzero(turns)
+        if removed == 0:
+            return positions
+        keep = np.empty(len(positions), dtype=bool)
+        keep[0] = keep[-1] = True
+        keep[1:-1] = turns
+        positions = positions[keep]
+        cx = cx[keep]
+        cy = cy[keep]
+        if removed < len(turns) >> 3:
+            slow_passes += 1
+            if slow_passes == 2:
+                break
+    return positions[_stack_chain(cx, cy, span)]
+
+# Andrew's monotone chain over an (n, 2) float or integer array. Returns the indices
+# of the hull vertices in counter-clockwise order, starting from the lexicographically
+# smallest point (the same order graham_scan_trial.graham_scan produces), together
+# with their coordinates. Collinear boundary points are not reported.
+def monotone_chain(points):
+    points = as_points(points)
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp), points[:0]
+    return sorted_hull(points, sort_points(points[:, 0], points[:, 1]))
+
+# The chain passes of monotone_chain, for an (n, 2) array (as returned by as_points)
+# whose lexicographic order `order` is already known. Returns the hull like
+# monotone_chain.
+def sorted_hull(points, order):
+    # Coordinates are gathered once in sorted order (widened to float64 so float32
+    # input keeps its turn signs, or to exact integers for integer input); all chain
+    # work then runs on contiguous arrays.
+    sx, sy, span = kernel_coordinates(points[order, 0], points[order, 1])
+
+    # Repeated points are dropped up front: a pass could otherwise remove every copy
+    # of a vertex at once, since each copy sits on a segment ending at another.
+    distinct = np.empty(len(order), dtype=bool)
+    distinct[0] = True
+    distinct[1:] = (sx[1:] != sx[:-1]) | (sy[1:] != sy[:-1])
+    if not distinct.all():
+        order, sx, sy = order[distinct], sx[distinct], sy[distinct]
+    if len(order) == 1:
+        return order, points[order]
+
+    # Points below the line from the first to the last point can only be on the lower
+    # chain, points above it only on the upper one; points on the line are on neither.
+    side = cross(sx[0], sy[0], sx[-1], sy[-1], sx[1:-1], sy[1:-1], span)
+    lower = np.flatnonzero(side < 0) + 1
+    upper = np.flatnonzero(side > 0)[::-1] + 1
+    last = len(order) - 1
+    lower = np.concatenate(([0], lower, [last]))
+    upper = np.concatenate(([last], upper, [0]))
+    lower = lower[prune_chain(sx[lower], sy[lower], span)]
+    upper = upper[prune_chain(sx[upper], sy[upper], span)]
+
+    indices = order[np.concatenate((lower[:-1], upper[:-1]))]
+    return indices, points[indices]
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 1000000)
+
+    start_time = time.perf_counter()
+    indices, hull = monotone_chain(points)
+    end_time = time.perf_counter()
+    print(hull)
+
+    print(f"Monotone chain took {end_time - start_time} seconds for {len(points)} points")
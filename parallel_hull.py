@@ -0,0 +1,104 @@
+import numpy as np
+import os
+import time
+from multiprocessing import Pool, shared_memory
+from monotone_chain import as_points, monotone_chain
+from merge_hull_trial import merger
+
+# Hulls one slab of the shared, slab-ordered point array inside a worker. Only the
+# hull vertices (positions in the shared array and coordinates) are sent back.
+def _hull_slab(task):
+    name, shape, dtype, start, stop = task
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        points = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        indices, hull = monotone_chain(points[start:stop])
+        return indices + start, hull.copy()
+    finally:
+        block.close()
+
+# Splits the points into `workers` slabs of about equal size at x quantiles. Points
+# equal to a pivot go to the slab on its right, so neighbouring slabs never share an
+# x value (merger needs its two hulls strictly side by side). Returns the slab-ordered
+# permutation of the points and the slab boundaries within it.
+def x_slabs(xs, workers):
+    n = len(xs)
+    kth = [n * i // workers for i in range(1, workers)]
+    pivots = np.unique(np.partition(xs, kth)[kth])
+    slab = np.searchsorted(pivots, xs, side='right').astype(np.uint16)
+    order = np.argsort(slab, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(slab, minlength=len(pivots) + 1))))
+    return order, bounds
+
+# Divide-and-conquer hull over worker processes. The points are split into x slabs,
+# copied once into shared memory, hulled slab by slab in a pool of workers and the
+# slab hulls are merged pairwise with merge_hull_trial.merger. Inputs below
+# `serial_cutoff` points are hulled in-process. Returns the hull indices and
+# coordinates in the same order as monotone_chain. Only the slab hulls run in
+# parallel: the slab split, the copy into shared memory and the merges stay in the
+# parent, and workers beyond os.cpu_count() only add process start-up and copying.
+def parallel_hull(points, workers=None, serial_cutoff=1000000):
+    points = as_points(points)
+    workers = min(workers or os.cpu_count() or 1, 65535)
+    if workers == 1 or len(points) < serial_cutoff:
+        return monotone_chain(points)
+
+    order, bounds = x_slabs(points[:, 0], workers)
+    block = shared_memory.SharedMemory(create=True, size=points.nbytes)
+    try:
+        shared = np.ndarray(points.shape, dtype=points.dtype, buffer=block.buf)
+        np.take(points, order, axis=0, out=shared)
+        tasks = [(block.name, points.shape, points.dtype.str, start, stop)
+                 for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        with Pool(min(workers, len(tasks))) as pool:
+            slab_hulls = pool.map(_hull_slab, tasks)
+        del shared
+    finally:
+        block.close()
+        block.unlink()
+
+    hulls = [np.column_stack((hull, indices)).tolist() for indices, hull in slab_hulls]
+    while len(hulls) > 1:
+        merged = [merger(hulls[i], hulls[i + 1]) for i in range(0, len(hulls) - 1, 2)]
+        if len(hulls) % 2:
+            merged.append(hulls[-1])
+        hulls = merged
+
+    # One chain pass over the few hull vertices restores the usual vertex order.
+    rows = np.array(hulls[0])
+    kept, _ = monotone_chain(rows[:, :2])
+    indices = order[rows[kept, 2].astype(np.intp)]
+    return indices, points[indices]
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    # Check the multi-process path against monotone_chain on small inputs, with the
+    # cutoff below n so that the slabs really go to workers and get merged.
+    for name, sample in (('uniform', generate_points('uniform', 20000)),
+                         ('grid', np.random.randint(0, 30, (20000, 2)).astype(float)),
+                         ('vertical line', np.column_stack((np.zeros(5000), np.random.uniform(-1, 1, 5000))))):
+        for workers in (2, 3, 4):
+            indices, hull = parallel_hull(sample, workers=workers, serial_cutoff=1000)
+            same = np.array_equal(hull, monotone_chain(sample)[1]) and np.array_equal(sample[indices], hull)
+            print(f"{workers} workers on {name} points: {'matches' if same else 'DIFFERS FROM'} monotone_chain")
+
+    # Time 1 to 16 workers, as far as there are cores for them, and report the speed-up
+    # over a single worker.
+    points = generate_points('uniform', 10000000)
+    cores = os.cpu_count() or 1
+    baseline = None
+    for workers in (1, 2, 4, 8, 16):
+        if workers > 1 and workers > cores:
+            print(f"{workers} workers: skipped, only {cores} cores")
+            continue
+        start_time = time.perf_counter()
+        indices, hull = parallel_hull(points, workers=workers)
+        end_time = time.perf_counter()
+        baseline = baseline or end_time - start_time
+        print(f"{workers} workers: {len(hull)} hull vertices in {end_time - start_time} seconds, "
+              f"speed-up {baseline / (end_time - start_time):.2f}")
@@ -0,0 +1,280 @@
+import math
+import numbers
+import numpy as np
+import time
+import hull_stats
+
+# Robust orientation predicate, after Shewchuk's adaptive orient2d. The determinant
+#
+#     orient2d(a, b, c) = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+#
+# is positive when a, b, c make a counter-clockwise turn, negative for a clockwise
+# turn and zero when they are collinear. It is first evaluated in float64. Rounding
+# never changes the sign of a difference or a product, so if the two products have
+# opposite signs (or one is zero) the float result already has the right sign.
+# Otherwise the sign is certain when |det| is at least CCW_ERRBOUND times the sum of
+# the two products' magnitudes, which bounds the error of all five roundings. Only
+# the rare triples that fail this test are evaluated again, exactly: with plain float
+# arithmetic when the coordinates are small integers (then nothing is rounded in the
+# first place) and with integer arithmetic on Python ints otherwise.
+#
+# Both forms return the float determinant when it is certain and the exact value
+# rounded to float otherwise, so the sign is always exact and the magnitude is still
+# usable as a (twice signed area) distance measure.
+EPSILON = 2.0 ** -53
+CCW_ERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+
+# Integer-valued differences up to this size multiply and subtract without rounding.
+_EXACT_DIFFERENCE = 2.0 ** 26
+
+# Integer coordinates whose differences are all below this have determinants that fit
+# in an int64: each product is below 2 ** 62 and so is the difference of two of them.
+INT64_SPAN = 2 ** 31
+
+# Exact determinant with integer arithmetic: integer inputs are used as they are, and
+# floats are written as integers times a power of two shared by the triple. A nonzero
+# value too small for a float is returned as the smallest float of its sign, one too
+# large as an infinity.
+def orient2d_exact(ax, ay, bx, by, cx, cy):
+    values = (ax, ay, bx, by, cx, cy)
+    if all(isinstance(v, numbers.Integral) for v in values):
+        ax, ay, bx, by, cx, cy = map(int, values)
+        det = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        return _rounded(det, 0)
+    parts = [math.frexp(float(v)) for v in values]
+    base = min((e for m, e in parts if m), default=0)
+    ax, ay, bx, by, cx, cy = (int(m * 2.0 ** 53) << (e - base) if m else 0 for m, e in parts)
+    det = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return _rounded(det, 2 * (base - 53))
+
+# The integer det times 2 ** power as a float whose sign is the sign of det.
+def _rounded(det, power):
+    if det == 0:
+        return 0.0
+    shift = max(det.bit_length() - 64, 0)
+    try:
+        value = math.ldexp(float(det >> shift if det > 0 else -(-det >> shift)), power + shift)
+    except OverflowError:
+        return math.inf if det > 0 else -math.inf
+    if value == 0:
+        return 5e-324 if det > 0 else -5e-324
+    return value
+
+# Exact determinants of many triples (six float64 arrays) with integer arithmetic:
+# every coordinate of a triple is written as an integer times a power of two shared by
+# the triple, and the determinant is evaluated on NumPy object arrays of Python ints.
+def _orient2d_integers(coordinates):
+    mantissa, exponent = np.frexp(np.stack(coordinates))
+    exponent = np.where(mantissa == 0, exponent.max(axis=0), exponent)
+    base = exponent.min(axis=0)
+    integers = np.ldexp(mantissa, 53).astype(np.int64).astype(object) << (exponent - base).astype(object)
+    ax, ay, bx, by, cx, cy = integers
+    det = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    try:
+        value = np.ldexp(det.astype(np.float64), 2 * (base - 53))
+    except OverflowError:
+        return np.array([orient2d_exact(*triple) for triple in zip(*(v.tolist() for v in coordinates))])
+    sign = (det > 0).astype(np.float64) - (det < 0)
+    return np.where((value == 0) & (sign != 0), sign * 5e-324, value)
+
+# Scalar orient2d for Python or NumPy numbers. With opposite signs |left + right| is
+# at most |det|, so the one comparison covers both cases of the filter.
+def orient2d(ax, ay, bx, by, cx, cy):
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    det = left - right
+    if abs(det) >= CCW_ERRBOUND * abs(left + right):
+        return det
+    # b == c makes both products the same rounded number, and the true value is 0.
+    if bx == cx and by == cy:
+        return 0.0
+    if det != det:
+        return det
+    if hull_stats.active is not None:
+        hull_stats.active.add('exact_orientation_tests')
+    return orient2d_exact(ax, ay, bx, by, cx, cy)
+
+# orient2d for points given as (x, y) sequences, with the float filter inlined so that
+# the common case costs a single call.
+def orient2d_points(a, b, c):
+    ax, ay = a
+    bx, by = b
+    cx, cy = c
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    det = left - right
+    if abs(det) >= CCW_ERRBOUND * abs(left + right):
+        return det
+    return orient2d(ax, ay, bx, by, cx, cy)
+
+# orient2d over arrays (or scalars) that broadcast together; returns a float64 array.
+# The differences are taken into fresh arrays of the full shape and everything after
+# works in place on those two buffers, so the filtered determinant costs about as much
+# as the bare expression with its five temporaries. Callers that know a bound `span`
+# on every coordinate difference (see coordinate_span) can pass it to use the static
+# filter instead of the dynamic one, which is cheaper still. Integer (or object)
+# coordinates skip the filter altogether and get exact integer determinants, see
+# _orient2d_integral.
+def orient2d_batch(ax, ay, bx, by, cx, cy, span=None):
+    coordinates = [np.asarray(v) for v in (ax, ay, bx, by, cx, cy)]
+    shape = np.broadcast_shapes(*(v.shape for v in coordinates))
+    stats = hull_stats.active
+    if stats is not None:
+        stats.add('orientation_tests', int(np.prod(shape)))
+    if all(v.dtype.kind in 'iuO' for v in coordinates):
+        return _orient2d_integral(coordinates, span)
+    coordinates = [v.astype(np.float64, copy=False) for v in coordinates]
+    ax, ay, bx, by, cx, cy = coordinates
+    if shape == ():
+        return np.float64(orient2d(float(ax), float(ay), float(bx), float(by), float(cx), float(cy)))
+    # left = (bx - ax) * (cy - ay) and right = (by - ay) * (cx - ax), rounded exactly
+    # as orient2d rounds them.
+    left = np.empty(shape)
+    right = np.empty(shape)
+    np.subtract(cy, ay, out=left)
+    left *= bx - ax
+    np.subtract(cx, ax, out=right)
+    right *= by - ay
+    if span is not None:
+        det = np.subtract(left, right, out=left)
+        uncertain = np.abs(det, out=right) <= static_bound(span)
+    else:
+        # With opposite signs |left + right| <= |det|, so this is never true for them.
+        det = left - right
+        bound = np.add(left, right, out=left)
+        np.abs(bound, out=bound)
+        bound *= CCW_ERRBOUND
+        uncertain = np.abs(det, out=right) < bound
+    if uncertain.any():
+        # A few positions gather far faster than a boolean mask over every entry.
+        uncertain = np.nonzero(uncertain)
+        det[uncertain] = _exact_batch(det.shape, uncertain, coordinates)
+    return det
+
+# orient2d_batch for integer coordinates. When the differences are known to stay below
+# INT64_SPAN (from `span`, or else from the range of all six inputs) the determinant
+# is computed in int64, where nothing can overflow; otherwise on object arrays of
+# Python ints. Either way the result is exact and its dtype is int64 or object.
+def _orient2d_integral(coordinates, span):
+    if any(v.dtype == object for v in coordinates):
+        dtype = object
+    else:
+        if span is None:
+            span = 0 if any(v.size == 0 for v in coordinates) else int(max(v.max() for v in coordinates)) - int(min(v.min() for v in coordinates))
+        dtype = np.int64 if span < INT64_SPAN else object
+    ax, ay, bx, by, cx, cy = (v.astype(dtype, copy=False) for v in coordinates)
+    det = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    if det.ndim == 0:
+        return det[()] if dtype == object else np.int64(det)
+    return det
+
+# Exact determinants of the triples selected by `uncertain` (index arrays into the
+# given shape, as np.nonzero returns them) from six float64 coordinate arrays or
+# scalars. A few triples are cheaper to evaluate one by one than with a dozen small
+# array operations (and are then counted as exact tests by orient2d).
+def _exact_batch(shape, uncertain, coordinates):
+    coordinates = [v if v.ndim == 0 else (v if v.shape == shape else np.broadcast_to(v, shape))[uncertain]
+                   for v in coordinates]
+    count = len(uncertain[0])
+    if count <= 32:
+        columns = [[float(v)] * count if v.ndim == 0 else v.tolist() for v in coordinates]
+        return np.array([orient2d(*triple) for triple in zip(*columns)], dtype=np.float64)
+    if hull_stats.active is not None:
+        hull_stats.active.add('exact_orientation_tests', int(count))
+    ax, ay, bx, by, cx, cy = coordinates
+    differences = (bx - ax, cy - ay, by - ay, cx - ax)
+    # At least one coordinate is an array, so this is a fresh array of the selection.
+    values = differences[0] * differences[1] - differences[2] * differences[3]
+    # Nothing is rounded with small integer coordinates, and a triple with two equal
+    # points makes the two products the same rounded number or zero, matching the
+    # true value 0.
+    exact = (bx == cx) & (by == cy) | (ax == cx) & (ay == cy) | (ax == bx) & (ay == by)
+    small = True
+    for d in differences:
+        small = small & (np.abs(d) <= _EXACT_DIFFERENCE)
+    for v in coordinates:
+        small = small & (v == np.floor(v))
+    rest = ~np.broadcast_to(exact | small, values.shape)
+    if rest.any():
+        values[rest] = _orient2d_integers([np.broadcast_to(v, values.shape)[rest] for v in coordinates])
+    return values
+
+# Static filter: when every coordinate difference is at most `span` in magnitude, a
+# float determinant larger than this in magnitude has the right sign, with no need to
+# look at the two products. Lets hot loops test one precomputed number and call
+# orient2d only below it.
+def static_bound(span):
+    return 2 * CCW_ERRBOUND * (1 + 8 * EPSILON) * span * span
+
+# Largest coordinate difference among the points with coordinates xs, ys: a float, or
+# a Python int for integer coordinates, computed without overflow.
+def coordinate_span(xs, ys):
+    if xs.dtype.kind in 'iuO' and ys.dtype.kind in 'iuO':
+        if len(xs) == 0:
+            return 0
+        return max(int(xs.max()) - int(xs.min()), int(ys.max()) - int(ys.min()))
+    if len(xs) == 0:
+        return 0.0
+    return float(max(xs.max() - xs.min(), ys.max() - ys.min()))
+
+# Coordinate arrays in the dtype the orientation kernels evaluate exactly: integer
+# coordinates as int64 when their span is below INT64_SPAN (the bound is checked here,
+# once, so no kernel can overflow later) and as object arrays of Python ints beyond it,
+# anything else as float64. Returns the two arrays and their coordinate_span.
+def kernel_coordinates(xs, ys):
+    if xs.dtype.kind in 'iuO' and ys.dtype.kind in 'iuO':
+        span = coordinate_span(xs, ys)
+        fits = span < INT64_SPAN
+        if fits and (xs.dtype == np.uint64 or ys.dtype == np.uint64) and len(xs):
+            fits = max(int(xs.max()), int(ys.max())) <= np.iinfo(np.int64).max
+        dtype = np.int64 if fits else object
+        return np.ascontiguousarray(xs, dtype=dtype), np.ascontiguousarray(ys, dtype=dtype), span
+    xs = np.ascontiguousarray(xs, dtype=np.float64)
+    ys = np.ascontiguousarray(ys, dtype=np.float64)
+    return xs, ys, coordinate_span(xs, ys)
+
+# Float determinants `det`, computed exactly as orient2d computes them before the
+# filter, with the entries the static filter for `span` cannot vouch for evaluated
+# again exactly (in place). The six coordinates broadcast like the determinants.
+# Integer determinants are exact already and are returned as they are.
+def static_filter(det, span, ax, ay, bx, by, cx, cy):
+    if det.dtype.kind in 'iuO':
+        return det
+    uncertain = np.abs(det) <= static_bound(span)
+    if uncertain.any():
+        coordinates = [np.asarray(v, dtype=np.float64) for v in (ax, ay, bx, by, cx, cy)]
+        uncertain = np.nonzero(uncertain)
+        det[uncertain] = _exact_batch(det.shape, uncertain, coordinates)
+    return det
+
+# Sign of orient2d as -1, 0 or 1.
+def orientation(ax, ay, bx, by, cx, cy):
+    det = orient2d(ax, ay, bx, by, cx, cy)
+    return (det > 0) - (det < 0)
+
+if __name__ == '__main__':
+    from fractions import Fraction
+
+    # Points on a line with tiny perturbations: the plain formula gets many signs wrong.
+    n = 1000000
+    t = np.random.uniform(0, 1, n)
+    a = np.array([0.5, 0.5])
+    b = np.array([12.0, 12.0])
+    c = np.column_stack((0.5 + t * 11.5, 0.5 + t * 11.5))
+    c[:, 1] += np.random.randint(-2, 3, n) * np.spacing(c[:, 1])
+
+    start_time = time.perf_counter()
+    robust = orient2d_batch(a[0], a[1], b[0], b[1], c[:, 0], c[:, 1])
+    end_time = time.perf_counter()
+    naive = (b[0] - a[0]) * (c[:, 1] - a[1]) - (b[1] - a[1]) * (c[:, 0] - a[0])
+    print(f"{np.count_nonzero(np.sign(naive) != np.sign(robust))} of {n} naive signs were wrong")
+
+    # Check the signs of a sample against exact rational arithmetic.
+    sample = np.random.choice(n, 20000, replace=False)
+    exact = [Fraction(bx - ax) * (Fraction(cy) - Fraction(ay)) - Fraction(by - ay) * (Fraction(cx) - Fraction(ax))
+             for ax, ay, bx, by, cx, cy in zip(*(np.broadcast_to(v, n)[sample].tolist()
+                                                 for v in (a[0], a[1], b[0], b[1], c[:, 0], c[:, 1])))]
+    wrong = np.count_nonzero(np.sign(robust[sample]) != np.sign(np.array([float(e) for e in exact])))
+    print(f"{wrong} of {len(sample)} robust signs differ from exact rational arithmetic")
+
+    print(f"orient2d_batch took {end_time - start_time} seconds for {n} triples")
@@ -3,25 +3,30 @@ import matplotlib.pyplot as plt
 import math
 from matplotlib.animation import FuncAnimation
 import time
-
-# Initialize the figure and axis
-fig, ax = plt.subplots(figsize=(10, 6))
+import hull_stats
+from predicates import orient2d_points
 
 # A function to compute the distance of a point from a line (line_1 to line_2)
 def distance(line_1, line_2, point):
     return abs((line_2[1] - line_1[1]) * point[0] - (line_2[0] - line_1[0]) * point[1] + line_2[0] * line_1[1] - line_2[1] * line_1[0]) / math.sqrt((line_2[1] - line_1[1]) ** 2 + (line_2[0] - line_1[0]) ** 2)
 
 # A function to determine if points are to the right of a line
+# (the sign of the turn is exact, see predicates.orient2d)
 def points_to_right(points, line_1, line_2):
-    def is_right(p):
-        return (line_2[0] - line_1[0]) * (p[1] - line_1[1]) - (line_2[1] - line_1[1]) * (p[0] - line_1[0]) > 0
-    return [p for p in points if is_right(p)]
+    if hull_stats.active is not None:
+        hull_stats.active.add('orientation_tests', len(points))
+    return [p for p in points if orient2d_points(line_1, line_2, p) > 0]
 
 # List to store frames for animation
 frames = []
 
 def find_hull(points, line_1, line_2):
+    stats = hull_stats.active
+    if stats is not None:
+        stats.enter()
     if len(points) == 0:
+        if stats is not None:
+            stats.leave()
         return [line_1]
     
     furthest = None
@@ -41,6 +46,8 @@ def find_hull(points, line_1, line_2):
     s1_hull = find_hull(s1, line_1, furthest)
     s2_hull = find_hull(s2, furthest, line_2)
 
+    if stats is not None:
+        stats.leave()
     return s1_hull + s2_hull
 
 def quickhull(points):
@@ -94,19 +101,23 @@ def generate_points(distribution, n):
     elif distribution == 'uniform':
         return np.random.uniform(-10, 10, (n, 2))
 
-# Generate points
-points = generate_points('uniform', 100)
+if __name__ == '__main__':
+    # Initialize the figure and axis
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Generate points
+    points = generate_points('uniform', 100)
 
-# Time the QuickHull algorithm
-start_time = time.time()
-hull = quickhull(points.tolist())
-end_time = time.time()
-print(hull)
+    # Time the QuickHull algorithm
+    start_time = time.time()
+    hull = quickhull(points.tolist())
+    end_time = time.time()
+    print(hull)
 
-print(f"QuickHull algorithm took {end_time - start_time} seconds")
+    print(f"QuickHull algorithm took {end_time - start_time} seconds")
 
-# Compute the Convex Hull using the QuickHull algorithm and visualize
-# hull = quickhull(points.tolist())
+    # Compute the Convex Hull using the QuickHull algorithm and visualize
+    # hull = quickhull(points.tolist())
 
-# Visualize the result
-# visualize(points, hull)
\ No newline at end of file
+    # Visualize the result
+    # visualize(points, hull)
\ No newline at end of file
@@ -0,0 +1,282 @@
+import numpy as np
+import time
+import hull_stats
+from monotone_chain import monotone_chain
+
+# Returns the input as a contiguous (n, 3) float64 array.
+def as_points_3d(points):
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError("points must be an (n, 3) array")
+    return points
+
+# Planes of the triangles faces (an (f, 3) array of point indices): unit normals by the
+# right-hand rule over the three corners, so that counter-clockwise triangles seen from
+# outside have outward normals, and offsets, so that the signed distance of a point p
+# from a plane is normal . p - offset.
+def planes(points, faces):
+    a = points[faces[:, 0]]
+    normals = np.cross(points[faces[:, 1]] - a, points[faces[:, 2]] - a)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    return normals, np.einsum('ij,ij->i', normals, a)
+
+# The 3D counterpart of quick_hall_trial.points_to_right, for many facets at once:
+# splits the candidates (indices into points) among the facets given by their planes.
+# A candidate goes to the facet it is farthest outside of; candidates no more than eps
+# outside every facet are inside the hull (or on it) and are dropped. Returns the
+# candidates grouped by facet, farthest last within each group, the facet of every
+# group and the group boundaries as offsets.
+def points_outside(points, candidates, normals, offsets, eps):
+    if hull_stats.active is not None:
+        hull_stats.active.add('plane_distance_tests', len(candidates) * len(normals))
+    distances = points[candidates] @ normals.T
+    distances -= offsets
+    facet = np.argmax(distances, axis=1)
+    farthest = distances[np.arange(len(candidates)), facet]
+    outside = farthest > eps
+    candidates, facet, farthest = candidates[outside], facet[outside], farthest[outside]
+    # A stable sort of small integer keys is a radix sort. Only the farthest point of
+    # each group has to be in place, so it is swapped to the end instead of sorting by
+    # distance as well.
+    order = np.argsort(facet.astype(np.uint16) if len(normals) <= 1 << 16 else facet, kind='stable')
+    candidates, facet, farthest = candidates[order], facet[order], farthest[order]
+    starts = np.flatnonzero(np.diff(facet, prepend=-1))
+    bounds = np.append(starts, len(candidates))
+    top = np.repeat(np.maximum.reduceat(farthest, starts), np.diff(bounds)) if len(starts) else farthest
+    at_top = np.flatnonzero(farthest == top)
+    best = at_top[np.searchsorted(at_top, starts)]
+    last = bounds[1:] - 1
+    candidates[best], candidates[last] = candidates[last], candidates[best]
+    return candidates, facet[starts], bounds
+
+# Four points spanning the hull, as far apart as the axis extremes allow: the two
+# extremes farthest from each other, the point farthest from the line through them and
+# the point farthest from the plane through all three. Stops early (returning fewer
+# points) when everything is within eps of a point, a line or a plane.
+def initial_simplex(points, eps):
+    extremes = np.concatenate((points.argmin(axis=0), points.argmax(axis=0)))
+    gaps = np.linalg.norm(points[extremes][:, None] - points[extremes][None], axis=2)
+    i, j = np.unravel_index(np.argmax(gaps), gaps.shape)
+    a, b = extremes[i], extremes[j]
+    if gaps[i, j] <= eps:
+        return [a]
+
+    direction = (points[b] - points[a]) / gaps[i, j]
+    line_distance = np.linalg.norm(np.cross(points - points[a], direction), axis=1)
+    c = np.argmax(line_distance)
+    if line_distance[c] <= eps:
+        return [a, b]
+
+    normal = np.cross(points[b] - points[a], points[c] - points[a])
+    normal /= np.linalg.norm(normal)
+    plane_distance = (points - points[a]) @ normal
+    d = np.argmax(np.abs(plane_distance))
+    if abs(plane_distance[d]) <= eps:
+        return [a, b, c]
+    # Orient the tetrahedron so that d is below the plane of a, b, c.
+    if plane_distance[d] > 0:
+        b, c = c, b
+    return [a, b, c, d]
+
+# QuickHull in 3D. Returns (indices, faces, facets): the indices of the hull vertices,
+# the hull surface as an (f, 3) array of point indices, one triangle per row in
+# counter-clockwise order seen from outside, and a facet label for every triangle.
+# Triangles of the same flat face of the hull share a label (see merge_facets).
+#
+# As in the 2D quick_hall_trial, every facet keeps the points outside of it (its
+# conflict list) and is expanded towards the farthest of them, the eye. The facets
+# the eye sees form a connected patch that is found by walking across edges from the
+# first one; the edges where the walk meets a facet the eye does not see make up the
+# horizon, and each horizon edge forms a new facet with the eye. The conflict lists of
+# the removed facets are split among the new ones with a single matrix product
+# (points_outside). A point only counts as outside a facet when it is more than eps
+# away from its plane, so nearly coplanar points never create sliver facets; by
+# default eps is the rounding error of the plane distances for the given coordinates.
+def quickhull_3d(points, eps=None):
+    points = as_points_3d(points)
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp), np.empty((0, 3), dtype=np.intp), np.empty(0, dtype=np.intp)
+    if eps is None:
+        eps = 3 * np.finfo(np.float64).eps * np.abs(points).max(axis=0).sum()
+    simplex = initial_simplex(points, eps)
+    if len(simplex) < 4:
+        return flat_hull(points, simplex)
+
+    a, b, c, d = simplex
+    faces = [(a, b, c), (a, d, b), (b, d, c), (c, d, a)]
+    # edges[(u, v)] is the facet whose boundary runs from u to v (counter-clockwise
+    # seen from outside); the facet across that edge is edges[(v, u)].
+    edges = {}
+    for facet, (u, v, w) in enumerate(faces):
+        edges[u, v] = edges[v, w] = edges[w, u] = facet
+    normals, offsets = planes(points, np.array(faces))
+    plane = [tuple(row) for row in np.column_stack((normals, offsets)).tolist()]
+    alive = [True] * 4
+    conflicts = [None] * 4
+    pending = []
+    candidates, owners, bounds = points_outside(points, np.arange(len(points)), normals, offsets, eps)
+    for facet, start, stop in zip(owners.tolist(), bounds[:-1].tolist(), bounds[1:].tolist()):
+        conflicts[facet] = candidates[start:stop]
+        pending.append(facet)
+
+    stats = hull_stats.active
+    while pending:
+        facet = pending.pop()
+        if not alive[facet]:
+            continue
+        eye = conflicts[facet][-1]
+        if stats is not None:
+            stats.add('expansions')
+        ex, ey, ez = points[eye].tolist()
+
+        # Walk the facets the eye sees and collect the horizon.
+        visible = [facet]
+        sees = {facet: True}
+        horizon = []
+        for current in visible:
+            u, v, w = faces[current]
+            for edge in ((u, v), (v, w), (w, u)):
+                neighbour = edges[edge[1], edge[0]]
+                if neighbour not in sees:
+                    nx, ny, nz, offset = plane[neighbour]
+                    sees[neighbour] = nx * ex + ny * ey + nz * ez - offset > eps
+                    if sees[neighbour]:
+                        visible.append(neighbour)
+                if not sees[neighbour]:
+                    horizon.append(edge)
+
+        if stats is not None:
+            stats.add('visible_facets', len(visible))
+            stats.add('horizon_edges', len(horizon))
+        orphans = []
+        for current in visible:
+            alive[current] = False
+            if conflicts[current] is not None:
+                orphans.append(conflicts[current])
+                conflicts[current] = None
+            u, v, w = faces[current]
+            for edge in ((u, v), (v, w), (w, u)):
+                del edges[edge]
+
+        first = len(faces)
+        for u, v in horizon:
+            edges[u, v] = edges[v, eye] = edges[eye, u] = len(faces)
+            faces.append((u, v, eye))
+        new_faces = np.array(faces[first:])
+        normals, offsets = planes(points, new_faces)
+        plane.extend(tuple(row) for row in np.column_stack((normals, offsets)).tolist())
+        alive.extend([True] * len(horizon))
+        conflicts.extend([None] * len(horizon))
+
+        orphans = np.concatenate(orphans)
+        candidates, owners, bounds = points_outside(points, orphans[orphans != eye], normals, offsets, eps)
+        for owner, start, stop in zip(owners.tolist(), bounds[:-1].tolist(), bounds[1:].tolist()):
+            conflicts[first + owner] = candidates[start:stop]
+            pending.append(first + owner)
+
+    live = np.flatnonzero(alive)
+    faces = np.array(faces, dtype=np.intp)[live]
+    normals = np.array(plane)[live, :3]
+    return merge_facets(points, faces, normals, edges, live, eps)
+
+# Groups the triangles into the flat faces of the hull and rebuilds those faces from
+# their corners. Neighbouring triangles whose far corners are within eps of each
+# other's planes are given the same facet label. A vertex is a corner when it touches
+# three or more facets; a vertex touching fewer (one on a flat face, or on the edge
+# between two faces) is a coplanar point the expansion happened to pick, and the
+# faces around it are triangulated again as fans over their corners. Both faces along
+# such an edge drop the point, so the surface stays closed.
+def merge_facets(points, faces, normals, edges, live, eps):
+    index = np.full(live[-1] + 1, -1, dtype=np.intp)
+    index[live] = np.arange(len(live))
+    rows = faces.tolist()
+    neighbours = np.array([[index[edges[v, u]], index[edges[w, v]], index[edges[u, w]]]
+                           for u, v, w in rows], dtype=np.intp)
+    # The corner of the neighbour across edge k of a triangle is the one that follows
+    # the shared edge's first vertex there.
+    across = np.empty_like(faces)
+    for k in range(3):
+        other = faces[neighbours[:, k]]
+        shared = faces[:, k]
+        position = np.argmax(other == shared[:, None], axis=1)
+        across[:, k] = other[np.arange(len(faces)), (position + 1) % 3]
+    offsets = np.einsum('ij,ij->i', normals, points[faces[:, 0]])
+    distance = np.einsum('ikj,ij->ik', points[across], normals) - offsets[:, None]
+    flat = (np.abs(distance) <= eps) & (np.einsum('ikj,ij->ik', normals[neighbours], normals) > 0)
+
+    # Connected components of the "flat" relation, by repeated pointer jumping.
+    labels = np.arange(len(faces))
+    first, second = np.nonzero(flat)
+    second = neighbours[first, second]
+    while True:
+        merged = labels.copy()
+        np.minimum.at(merged, first, labels[second])
+        np.minimum.at(merged, second, labels[first])
+        merged = merged[merged]
+        if np.array_equal(merged, labels):
+            break
+        labels = merged
+    labels = np.unique(labels, return_inverse=True)[1]
+
+    touching = np.unique(np.column_stack((faces.ravel(), np.repeat(labels, 3))), axis=0)
+    counts = np.bincount(touching[:, 0], minlength=len(points))
+    corner = counts >= 3
+    redo = np.unique(labels[~corner[faces].all(axis=1)])
+    if len(redo):
+        keep = ~np.isin(labels, redo)
+        pieces, piece_labels = [faces[keep]], [labels[keep]]
+        for label in redo.tolist():
+            members = labels == label
+            fan = _fan(points, faces[members], normals[members][0], corner)
+            pieces.append(fan)
+            piece_labels.append(np.full(len(fan), label))
+        faces = np.concatenate(pieces)
+        labels = np.concatenate(piece_labels)
+    return np.unique(faces), faces, labels
+
+# Fan triangulation of a flat convex face over its corners, counter-clockwise around
+# the normal. Keeps the given triangles if fewer than three corners are left.
+def _fan(points, triangles, normal, corner):
+    vertices = np.unique(triangles)
+    vertices = vertices[corner[vertices]]
+    if len(vertices) < 3:
+        return triangles
+    offsets = points[vertices] - points[vertices].mean(axis=0)
+    e1 = offsets[np.argmax(np.linalg.norm(offsets, axis=1))]
+    e1 = e1 / np.linalg.norm(e1)
+    e2 = np.cross(normal, e1)
+    vertices = vertices[np.argsort(np.arctan2(offsets @ e2, offsets @ e1))]
+    return np.column_stack((np.full(len(vertices) - 2, vertices[0]), vertices[1:-1], vertices[2:]))
+
+# Hull of points that lie within eps of a plane, a line or a single point, given the
+# first points of the initial simplex. A flat hull is the fan triangulation of its
+# polygon (one facet, facing along the normal of the first three points); a segment or
+# a point has no triangles.
+def flat_hull(points, simplex):
+    no_faces = np.empty((0, 3), dtype=np.intp), np.empty(0, dtype=np.intp)
+    if len(simplex) < 3:
+        return (np.array(simplex, dtype=np.intp),) + no_faces
+    a, b, c = (points[i] for i in simplex)
+    e1 = (b - a) / np.linalg.norm(b - a)
+    normal = np.cross(b - a, c - a)
+    e2 = np.cross(normal / np.linalg.norm(normal), e1)
+    relative = points - a
+    polygon = monotone_chain(np.column_stack((relative @ e1, relative @ e2)))[0]
+    faces = np.column_stack((np.full(len(polygon) - 2, polygon[0]), polygon[1:-1], polygon[2:]))
+    return np.sort(polygon), faces, np.zeros(len(faces), dtype=np.intp)
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 3))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 3))
+
+if __name__ == '__main__':
+    points = generate_points('uniform', 1000000)
+
+    start_time = time.perf_counter()
+    indices, faces, facets = quickhull_3d(points)
+    end_time = time.perf_counter()
+    print(f"{len(indices)} vertices, {len(faces)} triangles, {facets.max() + 1} facets")
+
+    print(f"3D QuickHull took {end_time - start_time} seconds for {len(points)} points")
@@ -0,0 +1,141 @@
+import numpy as np
+import time
+from monotone_chain import as_points, monotone_chain
+
+# Hull vertices as a float64 (h, 2) array in counter-clockwise order without
+# collinear vertices. Accepts a HullResult, an (indices, vertices) pair as returned by
+# the engines, or a vertex array.
+def _vertices(hull):
+    vertices = getattr(hull, 'vertices', None)
+    if vertices is None:
+        vertices = hull[1] if isinstance(hull, tuple) else hull
+    return as_points(vertices).astype(np.float64)
+
+# Direction angles of the hull edges (edge i runs from vertex i to vertex i + 1),
+# unwrapped so that they increase over one full turn, and the edge vectors.
+def edge_angles(v):
+    dx = np.roll(v[:, 0], -1) - v[:, 0]
+    dy = np.roll(v[:, 1], -1) - v[:, 1]
+    return np.unwrap(np.arctan2(dy, dx)), dx, dy
+
+# Rotating calipers with all caliper positions at once. For every edge and an angle
+# `offset` (measured counter-clockwise from the edge direction), the vertex where the
+# hull touches a supporting line with that direction: the start of the first edge
+# whose angle is at least the edge angle plus offset, found with np.searchsorted on
+# the sorted edge angles. Rounding in the angles can only be off by one vertex, so the
+# vertex and its two neighbours are returned as candidates, an (h, 3) index array.
+def support_candidates(theta, offset):
+    h = len(theta)
+    targets = theta[0] + np.mod(theta + offset - theta[0], 2 * np.pi)
+    k = np.searchsorted(theta, targets) % h
+    return np.stack(((k - 1) % h, k, (k + 1) % h), axis=1)
+
+# Largest projection of the candidate vertices onto the per-edge directions (ux, uy),
+# relative to the start of the edge.
+def _farthest(v, candidates, ux, uy):
+    px = v[candidates, 0] - v[:, :1]
+    py = v[candidates, 1] - v[:, 1:]
+    return (px * ux[:, None] + py * uy[:, None]).max(axis=1)
+
+# Farthest pair of hull vertices. Every antipodal pair is a vertex of some edge and
+# the vertex farthest from that edge, so only those pairs are measured. Returns the
+# distance and the positions of the two vertices in the hull.
+def diameter(hull):
+    v = monotone_chain(_vertices(hull))[1]
+    h = len(v)
+    if h < 3:
+        if h < 2:
+            return 0.0, (0, 0)
+        return float(np.hypot(*(v[1] - v[0]))), (0, 1)
+    theta, _, _ = edge_angles(v)
+    opposite = support_candidates(theta, np.pi)
+    ends = np.stack((np.arange(h), (np.arange(h) + 1) % h), axis=1)
+    a = np.repeat(ends, 3, axis=1).ravel()
+    b = np.tile(opposite, 2).ravel()
+    squared = ((v[a] - v[b]) ** 2).sum(axis=1)
+    best = np.argmax(squared)
+    return float(np.sqrt(squared[best])), (int(a[best]), int(b[best]))
+
+# Minimum width: the smallest distance between two parallel supporting lines, which
+# is always attained with one of the lines through a hull edge. Returns the width and
+# the position of that edge (from vertex i to i + 1) in the hull.
+def width(hull):
+    v = monotone_chain(_vertices(hull))[1]
+    if len(v) < 3:
+        return 0.0, 0
+    heights = _heights(v, *edge_angles(v))
+    best = np.argmin(heights)
+    return float(heights[best]), int(best)
+
+def _heights(v, theta, dx, dy):
+    length = np.hypot(dx, dy)
+    return _farthest(v, support_candidates(theta, np.pi), -dy / length, dx / length)
+
+# Enclosing rectangle flush with every edge in turn: the edge direction, its extent
+# along the edge (from the support points in the edge direction and against it) and
+# across it (the height). Both the minimum-area and the minimum-perimeter rectangles
+# have a side on a hull edge, so one of these is the answer.
+def _edge_rectangles(v):
+    theta, dx, dy = edge_angles(v)
+    length = np.hypot(dx, dy)
+    ux, uy = dx / length, dy / length
+    ahead = _farthest(v, support_candidates(theta, np.pi / 2), ux, uy)
+    behind = -_farthest(v, support_candidates(theta, 3 * np.pi / 2), -ux, -uy)
+    height = _farthest(v, support_candidates(theta, np.pi), -uy, ux)
+    return ux, uy, behind, ahead, height
+
+# Corners (counter-clockwise) of the rectangle flush with edge i.
+def _corners(v, i, ux, uy, behind, ahead, height):
+    origin = v[i]
+    u = np.array([ux[i], uy[i]])
+    n = np.array([-uy[i], ux[i]])
+    return np.array([origin + behind[i] * u,
+                     origin + ahead[i] * u,
+                     origin + ahead[i] * u + height[i] * n,
+                     origin + behind[i] * u + height[i] * n])
+
+def _degenerate_rectangle(v):
+    if len(v) == 0:
+        return np.empty((0, 2))
+    return np.array([v[0], v[-1], v[-1], v[0]])
+
+# Minimum-area enclosing rectangle. Returns the area and the (4, 2) corners in
+# counter-clockwise order.
+def min_area_rectangle(hull):
+    v = monotone_chain(_vertices(hull))[1]
+    if len(v) < 3:
+        return 0.0, _degenerate_rectangle(v)
+    ux, uy, behind, ahead, height = _edge_rectangles(v)
+    area = (ahead - behind) * height
+    best = int(np.argmin(area))
+    return float(area[best]), _corners(v, best, ux, uy, behind, ahead, height)
+
+# Minimum-perimeter enclosing rectangle. Returns the perimeter and the (4, 2) corners
+# in counter-clockwise order.
+def min_perimeter_rectangle(hull):
+    v = monotone_chain(_vertices(hull))[1]
+    if len(v) < 3:
+        return 2 * diameter(v)[0], _degenerate_rectangle(v)
+    ux, uy, behind, ahead, height = _edge_rectangles(v)
+    perimeter = 2 * (ahead - behind + height)
+    best = int(np.argmin(perimeter))
+    return float(perimeter[best]), _corners(v, best, ux, uy, behind, ahead, height)
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('gaussian', 1000000)
+    indices, hull = monotone_chain(points)
+
+    start_time = time.perf_counter()
+    print(f"diameter: {diameter(hull)}")
+    print(f"width: {width(hull)}")
+    print(f"min-area rectangle: {min_area_rectangle(hull)}")
+    print(f"min-perimeter rectangle: {min_perimeter_rectangle(hull)}")
+    end_time = time.perf_counter()
+
+    print(f"Calipers took {end_time - start_time} seconds for a {len(hull)}-vertex hull")
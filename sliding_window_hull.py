@@ -0,0 +1,112 @@
+import numpy as np
+import time
+from collections import deque
+from monotone_chain import monotone_chain
+from incremental_hull import IncrementalHull
+
+# Hull of the most recent points of a stream: the last `size` points, the points
+# pushed within the last `duration` time units, or both. Points expire in arrival
+# order, which makes the window a queue, and the queue is kept as two stacks:
+#
+# - the back holds the newest points in an IncrementalHull, so pushing is an O(log h)
+#   amortized insertion;
+# - the front holds the older points together with the hull of every suffix of them
+#   (the points from i onwards), so expiring a point just moves to the next suffix.
+#
+# When a point has to expire and the front is empty, the back is turned into the
+# front by inserting its points newest first into a fresh IncrementalHull and
+# recording the hull after each insertion. Suffixes that did not change the hull share
+# one array. Every point goes through this once, so updates are amortized O(h) at
+# worst. The current hull is the hull of the front suffix and the back hull, one
+# monotone chain pass over their vertices, redone only when one of the two changed.
+class SlidingWindowHull:
+    __slots__ = ('size', 'duration', 'back', 'back_times', 'front', 'front_hulls', '_parts', '_hull')
+
+    def __init__(self, size=None, duration=None):
+        if size is None and duration is None:
+            raise ValueError("a window needs a size, a duration or both")
+        self.size = size
+        self.duration = duration
+        self.back = IncrementalHull()
+        self.back_times = []
+        self.front = deque()
+        self.front_hulls = deque()
+        self._parts = None
+        self._hull = None
+
+    def __len__(self):
+        return len(self.front) + len(self.back_times)
+
+    # Adds a point that arrived at `timestamp` (needed for windows with a duration;
+    # timestamps must not decrease), expires what fell out of the window and returns
+    # the current hull.
+    def push(self, point, timestamp=None):
+        if self.duration is not None and timestamp is None:
+            raise ValueError("a window with a duration needs timestamps")
+        self.back.insert(point)
+        self.back_times.append((timestamp, (float(point[0]), float(point[1]))))
+        self.expire(timestamp)
+        return self.hull
+
+    # Drops the points older than `now - duration` and those beyond the window size.
+    # Also useful on its own to advance time without pushing a point.
+    def expire(self, now=None):
+        while len(self):
+            if self.size is not None and len(self) > self.size:
+                self._pop()
+                continue
+            oldest = self.front[0][0] if self.front else self.back_times[0][0]
+            if self.duration is not None and now is not None and oldest < now - self.duration:
+                self._pop()
+                continue
+            break
+
+    # Current hull as an (h, 2) array in the same order as monotone_chain.
+    @property
+    def hull(self):
+        front = self.front_hulls[0] if self.front_hulls else None
+        back = self.back.hull
+        if self._parts is None or self._parts[0] is not front or self._parts[1] is not back:
+            if front is None:
+                self._hull = back
+            elif not len(back):
+                self._hull = front
+            else:
+                self._hull = monotone_chain(np.concatenate((front, back)))[1]
+            self._parts = (front, back)
+        return self._hull
+
+    def _pop(self):
+        if not self.front:
+            self._flip()
+        self.front.popleft()
+        self.front_hulls.popleft()
+
+    def _flip(self):
+        suffix = IncrementalHull()
+        hulls = []
+        for _, point in reversed(self.back_times):
+            suffix.insert(point)
+            hulls.append(suffix.hull)
+        self.front = deque(self.back_times)
+        self.front_hulls = deque(reversed(hulls))
+        self.back = IncrementalHull()
+        self.back_times = []
+
+def generate_points(distribution, n):
+    if distribution == 'gaussian':
+        return np.random.normal(0, 1, (n, 2))
+    elif distribution == 'uniform':
+        return np.random.uniform(-10, 10, (n, 2))
+
+if __name__ == '__main__':
+    points = generate_points('gaussian', 1000000)
+
+    window = SlidingWindowHull(size=10000)
+    start_time = time.perf_counter()
+    for point in points.tolist():
+        window.push(point)
+    end_time = time.perf_counter()
+    print(window.hull)
+
+    print(f"{len(points)} pushes through a {window.size}-point window took {end_time - start_time} seconds")